@@ -0,0 +1,67 @@
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from APIs.metrics import add_rows, record, timed
+
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+def create_async_pool(db_config: Dict[str, Any], min_size: int, max_size: int, timeout: float) -> AsyncConnectionPool:
+    """Build the process-wide async pool (opened later inside the event loop)"""
+    global _pool
+    kwargs = dict(db_config)
+    # psycopg 3 only understands the libpq keyword
+    if "database" in kwargs:
+        kwargs["dbname"] = kwargs.pop("database")
+
+    _pool = AsyncConnectionPool(
+        kwargs=kwargs,
+        min_size=min_size,
+        max_size=max_size,
+        timeout=timeout,
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    return _pool
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    """Return the async pool created by create_async_pool"""
+    if _pool is None:
+        raise RuntimeError("Async connection pool has not been created")
+    return _pool
+
+
+async def execute_query_async(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    """Execute a query on the async pool and return results as list of dictionaries"""
+    started = time.perf_counter()
+    async with get_async_pool().connection() as conn:
+        record("acquire", time.perf_counter() - started)
+        async with conn.cursor(row_factory=dict_row) as cur:
+            with timed("db"):
+                await cur.execute(query, params or ())
+                rows = await cur.fetchall()
+    add_rows(len(rows))
+    return rows
+
+
+async def stream_query_async(query: str, params: tuple = None, itersize: int = 2000) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield result batches from a server-side cursor, holding at most `itersize` rows"""
+    started = time.perf_counter()
+    async with get_async_pool().connection() as conn:
+        record("acquire", time.perf_counter() - started)
+        async with conn.cursor(name="export_cursor", row_factory=dict_row) as cur:
+            cur.itersize = itersize
+            with timed("db"):
+                await cur.execute(query, params or ())
+            while True:
+                with timed("db"):
+                    rows = await cur.fetchmany(itersize)
+                if not rows:
+                    break
+                add_rows(len(rows))
+                yield rows
@@ -0,0 +1,146 @@
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from data.versions import VERSIONS_TABLE
+
+QueryRunner = Callable[[str, tuple], Awaitable[list]]
+
+
+class ResultCache(ABC):
+    """Interface for query result cache backends"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUCache(ResultCache):
+    """In-process cache with per-entry TTL and least-recently-used eviction"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+class TableVersions:
+    """(generation, updated_at) per public table from data.versions.
+
+    Loads, rollup rebuilds and partition detaches all bump the generation, so a
+    version changes whenever what the table returns does. Versions are read on
+    every call, never cached: a validator checked against an old generation
+    would answer 304 to a client that has just missed a load. A table nothing
+    has bumped yet (or every table, before the first load creates the versions
+    table) is at (0, None).
+    """
+
+    def __init__(self, run_query: QueryRunner):
+        self.run_query = run_query
+        self._table_exists = False
+
+    @staticmethod
+    def query(tables: Sequence[str]) -> Tuple[str, List[Any]]:
+        """One primary key lookup per table, in one round trip"""
+        return (
+            f"SELECT table_name, version, updated_at FROM {VERSIONS_TABLE} WHERE table_name = ANY(%s)",
+            [[f"public.{table}" for table in tables]],
+        )
+
+    async def _versions_table_exists(self) -> bool:
+        # Once created it stays, so only a missing table is checked again
+        if not self._table_exists:
+            rows = await self.run_query("SELECT to_regclass(%s) IS NOT NULL AS present", (VERSIONS_TABLE,))
+            self._table_exists = bool(rows[0]["present"])
+        return self._table_exists
+
+    async def get(self, tables: Sequence[str]) -> Tuple[Any, ...]:
+        found = {}
+        if await self._versions_table_exists():
+            query, params = self.query(tables)
+            rows = await self.run_query(query, tuple(params))
+            found = {row["table_name"]: (row["version"], row["updated_at"]) for row in rows}
+        return tuple(found.get(f"public.{table}", (0, None)) for table in tables)
+
+    def reset(self) -> None:
+        # A dropped and recreated versions table is picked up again
+        self._table_exists = False
+
+
+class QueryCache:
+    """Caches query results keyed on query text, params and source table versions"""
+
+    def __init__(self, backend: ResultCache, run_query: QueryRunner):
+        self.backend = backend
+        self.run_query = run_query
+        self.versions = TableVersions(run_query)
+
+    @staticmethod
+    def make_key(query: str, params: tuple, versions: tuple) -> str:
+        return hashlib.sha1(repr((query, params, versions)).encode()).hexdigest()
+
+    async def fetch(self, query: str, params: tuple, ttl: float, tables: Sequence[str]) -> list:
+        """Return cached rows, running the query when missing, expired or the tables were reloaded"""
+        params = tuple(params or ())
+        # A new table version changes the key, so results from before a load or rebuild are never served
+        key = self.make_key(query, params, await self.versions.get(tables))
+        rows = self.backend.get(key)
+        if rows is None:
+            rows = await self.run_query(query, params)
+            self.backend.set(key, rows, ttl)
+        return rows
+
+    def invalidate(self) -> None:
+        self.backend.clear()
+        self.versions.reset()
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+from APIs.cache import TableVersions
+from APIs.export import EXPORT_TABLES
+from data.rollups import PRODUCT_DAILY_ROLLUP, PRODUCT_ROLLUP, STORE_DAILY_ROLLUP, STORE_ROLLUP
+
+logger = logging.getLogger(__name__)
+
+# Analytics endpoints and the tables they read: the rollups are versioned on their own, since a
+# rebuild changes them without touching transactions
+ANALYTICS_TABLES = {
+    "sales-by-store": ("stores", STORE_ROLLUP, STORE_DAILY_ROLLUP),
+    "top-products": ("products", PRODUCT_ROLLUP, PRODUCT_DAILY_ROLLUP),
+}
+
+
+def tables_for_path(path: str) -> Optional[Tuple[str, ...]]:
+    """Tables a GET on this path reads, or None when the route isn't versioned"""
+    parts = path.strip("/").split("/")
+    if parts[0] in EXPORT_TABLES:
+        return (parts[0],)
+    if len(parts) == 2 and parts[0] == "analytics":
+        return ANALYTICS_TABLES.get(parts[1])
+    if len(parts) == 2 and parts[0] == "export" and parts[1] in EXPORT_TABLES:
+        return (parts[1],)
+    return None
+
+
+def make_etag(versions: Sequence[Any]) -> str:
+    # Weak: the same data may be sent gzip-, brotli- or un-compressed
+    return 'W/"' + hashlib.sha1(repr(tuple(versions)).encode()).hexdigest()[:20] + '"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified(headers: Headers, etag: str, updated_at: Optional[datetime]) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since; compare weakly
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates stop at the second: a version bumped during the header's second may be newer than
+        # the client's copy, so only a strictly earlier update counts as unmodified
+        return since.tzinfo is not None and updated_at < since
+    return False
+
+
+class ConditionalGetMiddleware:
+    """ETag / Last-Modified validators for GETs, derived from the source tables' versions.
+
+    A matching If-None-Match (or If-Modified-Since) gets a 304 before the route
+    runs, so an unchanged table costs one primary key lookup on the versions
+    table instead of the query and the serialization. Last-Modified is left out
+    until every table read has been bumped at least once.
+    """
+
+    def __init__(self, app, versions: TableVersions):
+        self.app = app
+        self.versions = versions
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        tables = tables_for_path(scope["path"])
+        if tables is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            versions = await self.versions.get(tables)
+        except Exception:
+            # Validators are an optimization: let the route run (and report any DB error) itself
+            logger.warning("Could not read table versions for %s", scope["path"], exc_info=True)
+            await self.app(scope, receive, send)
+            return
+        validators = {"ETag": make_etag(versions)}
+        updated = [updated_at for _, updated_at in versions]
+        last_modified = max(updated) if all(updated_at is not None for updated_at in updated) else None
+        if last_modified is not None:
+            validators["Last-Modified"] = http_date(last_modified)
+        if not_modified(Headers(scope=scope), validators["ETag"], last_modified):
+            await Response(status_code=304, headers=validators)(scope, receive, send)
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
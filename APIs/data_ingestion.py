@@ -1,16 +1,36 @@
-import requests
-import pandas as pd
+import csv
+import io
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import logging
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import psycopg2
-from psycopg2.extras import execute_values
+
+from data.copy_stream import IterStream
+from data.load_metrics import table_load
+from data.partitions import ensure_partitions_for
+from data.rollups import apply_staged_transactions
+from data.schema import TABLES, create_table_sql, index_statements, merge_sql, primary_key_columns
+from data.versions import bump_versions, create_versions_table
 
 load_dotenv()
 
-url = 'http://localhost:8000'
+# requests, pandas and psycopg2 are imported where they are used: the Airflow DAGs import
+# this module, and the scheduler re-parses them continuously
+
+url = os.getenv("API_URL", 'http://localhost:8000')
+PAGE_SIZE = 1000  # server-side maximum for list endpoints
+MAX_WORKERS = int(os.getenv("EXTRACT_WORKERS", "8"))
+REQUEST_TIMEOUT = 60
+COPY_FORMAT = os.getenv("EXTRACT_COPY_FORMAT", "csv")  # csv or binary
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+# ETag / Last-Modified of each endpoint's last successful pull
+EXTRACT_STATE_TABLE = "apis.extract_state"
+# Cached analytics requested after each load
+WARM_PATHS = ["/analytics/sales-by-store", "/analytics/top-products?limit=10"]
 endpoints = [
 "products",
 "customers",
@@ -29,67 +49,292 @@ user = os.getenv("DB_USER")
 password = os.getenv("DB_PASSWORD")
 host = os.getenv("DB_HOST")
 
-conn = psycopg2.connect(
-    dbname=database,
-    user=user,
-    password=password,
-    host=host,
-    port=port
-)
-
-def create_table_if_not_exists(table_name, df):
-    columns = []
-    for col, dtype in df.dtypes.items():
-        if "int" in str(dtype):
-            sql_type = "BIGINT"
-        elif "float" in str(dtype):
-            sql_type = "DOUBLE PRECISION"
-        else:
-            sql_type = "TEXT"
-        columns.append(f"{col} {sql_type}")
-    
-    columns.append("load_date_time TIMESTAMP")
-    
-    create_query = f"""
-        CREATE TABLE IF NOT EXISTS apis.{table_name} (
-            {', '.join(columns)}
-        );
-    """
+def connect():
+    import psycopg2
+
+    return psycopg2.connect(
+        dbname=database,
+        user=user,
+        password=password,
+        host=host,
+        port=port
+    )
+
+def create_table_if_not_exists(conn, table_name):
+    # apis.* mirrors the API as a landing area: typed with primary keys, but endpoints
+    # load independently and in parallel, so no foreign keys between them
+    create_query = create_table_sql(
+        "apis", table_name, extra_columns=[("load_date_time", "TIMESTAMP")]
+    )
     curr = conn.cursor()
     curr.execute(create_query)
+    # The merge needs the primary key up front; pages land in a staging table, so
+    # the indexes never slow down the COPY itself
+    for statement in index_statements("apis", table_name, foreign_keys=False):
+        curr.execute(statement)
     conn.commit()
 
-def ingest_data_to_db(table_name, df):
-    cols = list(df.columns)
-    values = [tuple(row) for row in df.to_numpy()]
+class PageCopyStream(IterStream):
+    """File-like object that feeds COPY FROM STDIN one API page at a time"""
 
-    query = f"""
-        INSERT INTO apis.{table_name} ({', '.join(cols)})
-        VALUES %s
-    """
+    copy_options = "CSV"
+
+    def __init__(self, pages, columns, load_date_time, on_page=None):
+        self.columns = columns
+        self.load_date_time = load_date_time
+        self.on_page = on_page
+        self.rows = 0
+        super().__init__(self._encode(page) for page in pages)
 
+    def _encode(self, page):
+        self.rows += len(page)
+        if self.on_page:
+            self.on_page(page)
+        return self._format(page)
+
+    def _format(self, page):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row in page:
+            writer.writerow([row.get(col) for col in self.columns] + [self.load_date_time])
+        return out.getvalue()
+
+class BinaryPageCopyStream(PageCopyStream):
+    """PageCopyStream sending COPY's binary format, typed from the schema registry"""
+
+    empty = b""
+    copy_options = "(FORMAT binary)"
+
+    def __init__(self, pages, columns, load_date_time, pg_types, on_page=None):
+        from data.pgbinary import HEADER, TRAILER
+
+        self.pg_types = list(pg_types) + ["TIMESTAMP"]
+        super().__init__(pages, columns, load_date_time, on_page)
+        self.chunks = itertools.chain([HEADER], self.chunks, [TRAILER])
+
+    def _format(self, page):
+        import pandas as pd
+
+        from data.pgbinary import encode_frame
+
+        df = pd.DataFrame(page, columns=self.columns).assign(load_date_time=self.load_date_time)
+        return encode_frame(df, self.pg_types)
+
+def create_extract_state_table(conn):
     curr = conn.cursor()
-    execute_values(curr, query, values)
+    # Endpoints are extracted in parallel: serialize the CREATE so concurrent runs don't collide
+    curr.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (EXTRACT_STATE_TABLE,))
+    curr.execute(f"""
+        CREATE TABLE IF NOT EXISTS {EXTRACT_STATE_TABLE} (
+            endpoint TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TIMESTAMP
+        );
+    """)
     conn.commit()
     curr.close()
 
-def get_data_from_api(endpoint, params):
-    response = requests.get(f'{url}/{endpoint}')
-    if response.status_code == 200:
-        return pd.DataFrame(response.json()['data'])
-    else:
-        print(f"Failed to fetch data from {endpoint}. Status code: {response.status_code}")
+def get_validators(conn, endpoint):
+    curr = conn.cursor()
+    curr.execute(f"SELECT etag, last_modified FROM {EXTRACT_STATE_TABLE} WHERE endpoint = %s", (endpoint,))
+    row = curr.fetchone()
+    curr.close()
+    return {"etag": row[0], "last_modified": row[1]} if row else {}
+
+def save_validators(curr, endpoint, validators):
+    curr.execute(f"""
+        INSERT INTO {EXTRACT_STATE_TABLE} (endpoint, etag, last_modified, updated_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (endpoint) DO UPDATE SET
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            updated_at = EXCLUDED.updated_at
+    """, (endpoint, validators.get("etag"), validators.get("last_modified")))
+
+def stream_endpoint_to_db(endpoint, session):
+    with table_load("data_ingestion", endpoint) as stats:
+        conn = connect()
+        try:
+            create_extract_state_table(conn)
+            # Validators from the last successful pull: an unchanged endpoint answers 304 to the first page
+            validators = get_validators(conn, endpoint)
+            pages = iter_pages(session, endpoint, validators=validators)
+            first_page = next(pages, None)
+            if first_page is None:
+                return 0
+
+            create_table_if_not_exists(conn, endpoint)
+            create_versions_table(conn)
+            columns = TABLES[endpoint].column_names + ["load_date_time"]
+            pages = itertools.chain([first_page], pages)
+            if COPY_FORMAT == "binary":
+                pg_types = [col.pg_type for col in TABLES[endpoint].columns]
+                stream = BinaryPageCopyStream(pages, columns[:-1], datetime.now(), pg_types)
+            else:
+                stream = PageCopyStream(pages, columns[:-1], datetime.now())
+
+            curr = conn.cursor()
+            # Pages land in a staging table and are merged on the primary key, so
+            # re-pulling an endpoint updates rows instead of duplicating them
+            curr.execute(f"""
+                CREATE TEMP TABLE stage_{endpoint}
+                (LIKE apis.{endpoint} INCLUDING DEFAULTS)
+                ON COMMIT DROP
+            """)
+            copy_query = f"""
+                COPY stage_{endpoint} ({', '.join(columns)})
+                FROM STDIN
+                WITH {stream.copy_options}
+            """
+            # Pages are fetched as COPY reads them, so the COPY duration includes the API calls
+            with stats.timed("copy"):
+                curr.copy_expert(copy_query, stream, size=64 * 1024)
+            with stats.timed("merge"):
+                if TABLES[endpoint].partition_key:
+                    ensure_partitions_for(curr, "apis", endpoint, f"stage_{endpoint}")
+                if endpoint == "transactions":
+                    apply_staged_transactions(curr, "apis", f"stage_{endpoint}")
+                keys = primary_key_columns(curr, "apis", endpoint)
+                curr.execute(merge_sql("apis", endpoint, f"stage_{endpoint}", columns, keys))
+            bump_versions(curr, "apis", [endpoint])
+            save_validators(curr, endpoint, validators)
+            conn.commit()
+            curr.close()
+            stats.rows, stats.bytes = stream.rows, stream.bytes_read
+            return stream.rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+def create_session(pool_size=MAX_WORKERS):
+    # One keep-alive session shared by all workers, retrying transient failures with backoff
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def iter_pages(session, endpoint, params=None, validators=None):
+    """Walk the keyset cursor until the endpoint is exhausted, one page at a time.
+
+    With `validators` ({"etag", "last_modified"} from an earlier pull) the first
+    request is conditional and a 304 yields nothing. The dict is then updated with
+    the first response's validators, for the caller to save once the pages are loaded.
+    """
+    params = {"limit": PAGE_SIZE, **(params or {})}
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    first = True
+    while True:
+        response = session.get(
+            f'{url}/{endpoint}', params=params, headers=headers if first else None, timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        if first and validators is not None:
+            # Every page of a table carries the same validators
+            validators.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        first = False
+        body = response.json()
+        if body['data']:
+            yield body['data']
+        cursor = body.get('next_cursor')
+        if cursor is None:
+            break
+        params = {k: v for k, v in params.items() if k != "offset"}
+        params["after"] = cursor
+
+def load_endpoint(endpoint, session=None):
+    """Extract one endpoint into apis.<endpoint>, returning the rows loaded (one Airflow task per endpoint)"""
+    return stream_endpoint_to_db(endpoint, session or create_session(pool_size=1))
+
+def warm_api_cache(session=None, paths=WARM_PATHS):
+    """Drop the API's cached analytics and re-request them, so the first real caller gets a hit"""
+    session = session or create_session(pool_size=1)
+    session.post(f'{url}/cache/invalidate', timeout=REQUEST_TIMEOUT).raise_for_status()
+    for path in paths:
+        session.get(f'{url}{path}', timeout=REQUEST_TIMEOUT).raise_for_status()
+    return len(paths)
+
+def export_table(table, fmt="csv", export_dir=EXPORT_DIR, session=None):
+    """Stream /export/<table> to <export_dir>/<table>.<fmt>, returning the file path"""
+    session = session or create_session(pool_size=1)
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{table}.{fmt}")
+    partial = f"{path}.part"
+    with session.get(
+        f'{url}/export/{table}', params={"format": fmt}, stream=True, timeout=REQUEST_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        with open(partial, "wb") as f:
+            for block in response.iter_content(chunk_size=1024 * 1024):
+                f.write(block)
+    # Readers of the export directory never see a half-written file
+    os.replace(partial, path)
+    return path
+
+def get_data_from_api(endpoint, params, session=None):
+    import pandas as pd
+    import requests
+
+    session = session or create_session(pool_size=1)
+    try:
+        rows = [row for page in iter_pages(session, endpoint, params) for row in page]
+    except requests.RequestException as e:
+        print(f"Failed to fetch data from {endpoint}: {e}")
         return pd.DataFrame()
+    return pd.DataFrame(rows)
     
+def extract_all(session=None):
+    """Extract every endpoint into apis.*, returning the rows loaded per endpoint (failures are skipped)"""
+    import psycopg2
+    import requests
+
+    session = session or create_session()
+    loaded = {}
+    # Each endpoint streams its pages straight into COPY on its own connection
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(stream_endpoint_to_db, endpoint, session): endpoint
+            for endpoint in endpoints
+        }
+        for future in as_completed(futures):
+            endpoint = futures[future]
+            try:
+                rows = future.result()
+            except (requests.RequestException, psycopg2.Error) as e:
+                print(f"Failed to load {endpoint}: {e}")
+                continue
+            loaded[endpoint] = rows
+            if rows:
+                print(f'Loaded {rows} rows from {endpoint}')
+            else:
+                print(f'No Data From {endpoint}')
+    return loaded
+
 def main():
-    for endpoint in endpoints:
-        df = get_data_from_api(endpoint, params = {"limit":10, "offset":0})
-        if not df.empty:
-            create_table_if_not_exists(endpoint, df)
-            df["load_date_time"] = datetime.now()
-            ingest_data_to_db(endpoint, df)
-            print(f'Data from {endpoint}:', df)
-        else:
-            print(f'No Data From {endpoint}')
-main()
-conn.close()
+    # Per-endpoint timings are logged by data.load_metrics
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    extract_all()
+
+if __name__ == "__main__":
+    main()
+
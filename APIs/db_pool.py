@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time"""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with health-checked checkouts"""
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, **db_config):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool sizes must satisfy 0 <= minconn <= maxconn, maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.db_config = db_config
+
+        # LIFO keeps a small set of hot connections and lets the rest go idle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._size = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._replaced = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for _ in range(minconn):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.db_config)
+        with self._lock:
+            self._size += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds"""
+        if self._closed:
+            raise PoolTimeout("Connection pool is closed")
+
+        start = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self._timeouts += 1
+        if not acquired:
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._connect()
+                    break
+                if self._is_healthy(conn):
+                    break
+                # Broken connection (server restart, idle timeout...): replace it
+                self._discard(conn)
+                with self._lock:
+                    self._replaced += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return conn
+
+    def putconn(self, conn):
+        """Return a connection to the pool, dropping it if it is unusable"""
+        try:
+            if self._closed or conn.closed:
+                self._discard(conn)
+                return
+            if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self._discard(conn)
+                    return
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows a connection for the duration of the block"""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Close every idle connection; checked-out ones are closed on return"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizing and checkout latency"""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "idle": self._idle.qsize(),
+                "in_use": self._size - self._idle.qsize(),
+                "waiting": self._waiting,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "replaced": self._replaced,
+                "avg_wait_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
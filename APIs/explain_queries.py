@@ -0,0 +1,105 @@
+"""Report the EXPLAIN plan of every query the retail API issues.
+
+    python -m APIs.explain_queries            # estimated plans
+    python -m APIs.explain_queries --analyze  # run the queries and show actual timings
+
+Sequential scans on the large tables are flagged so a missing index shows up
+before it shows up as a slow endpoint.
+"""
+import argparse
+import datetime
+import re
+
+import psycopg2
+
+from APIs.cache import TableVersions
+from APIs.config import DB_CONFIG
+from APIs.queries import (
+    LIST_FILTERS, LOOKUP_TABLES, batch_query, date_range_filter, list_query, lookup_query, paginate,
+    sales_by_store_query, top_products_query,
+)
+from data.partitions import PARTITION_SUFFIX
+from data.schema import TABLES
+
+# Tables where a sequential scan on an endpoint query is a problem
+LARGE_TABLES = {"transactions", "inventory", "returns", "customers"}
+
+# A value for each list filter, and the window used for the date-range variants
+SAMPLE_FILTERS = {"category": "Apparel", "store_id": 1, "product_id": 1, "customer_id": 1}
+SAMPLE_DATES = (datetime.date(2024, 1, 1), datetime.date(2024, 3, 31))
+SAMPLE_IDS = [1, 2, 3]
+PAGE_SIZE = 100
+DEEP_OFFSET = 10000
+
+
+def endpoint_queries():
+    """(endpoint, query, params) for every query the routes in hosting_apis.py run, built by the same helpers"""
+    queries = []
+
+    def page(endpoint, table, query, params):
+        key = TABLES[table].primary_key
+        queries.append((f"{endpoint} (keyset)", *paginate(query, params, key, PAGE_SIZE, 0, 1)))
+        queries.append((f"{endpoint} (offset)", *paginate(query, params, key, PAGE_SIZE, DEEP_OFFSET, None)))
+
+    for table, filters in LIST_FILTERS.items():
+        page(f"/{table}", table, *list_query(table))
+        for column in filters:
+            page(f"/{table}?{column}=", table, *list_query(table, **{column: SAMPLE_FILTERS[column]}))
+
+    dates, date_params = date_range_filter("transaction_date", *SAMPLE_DATES)
+    query, params = list_query("transactions")
+    page("/transactions?start_date=&end_date=", "transactions", query + dates, params + date_params)
+
+    for table in LOOKUP_TABLES:
+        key = TABLES[table].primary_key
+        queries.append((f"/{table}/{{id}}", lookup_query(table, key), [SAMPLE_IDS[0]]))
+        queries.append((f"/{table}?ids=", batch_query(table, key), [SAMPLE_IDS]))
+
+    queries.append(("/analytics/sales-by-store", *sales_by_store_query(None, None)))
+    queries.append(("/analytics/sales-by-store?start_date=&end_date=", *sales_by_store_query(*SAMPLE_DATES)))
+    queries.append(("/analytics/top-products", *top_products_query(10, None, None)))
+    queries.append(("/analytics/top-products?start_date=&end_date=", *top_products_query(10, *SAMPLE_DATES)))
+    queries.append(("cache version check", *TableVersions.query(list(TABLES))))
+    return queries
+
+
+SEQ_SCAN = re.compile(r"Seq Scan on (?:\w+\.)?(\w+)")
+
+
+def seq_scans(plan_lines):
+    """Relations read with a sequential scan anywhere in a text plan (partitions count as their table)"""
+    return [PARTITION_SUFFIX.sub("", match) for line in plan_lines for match in SEQ_SCAN.findall(line)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyze", action="store_true", help="Execute the queries (EXPLAIN ANALYZE)")
+    args = parser.parse_args()
+
+    options = "ANALYZE, BUFFERS, " if args.analyze else ""
+    queries = endpoint_queries()
+    conn = psycopg2.connect(**DB_CONFIG)
+    problems = 0
+    try:
+        curr = conn.cursor()
+        for endpoint, query, params in queries:
+            curr.execute(f"EXPLAIN ({options}FORMAT TEXT) {query}", params)
+            plan_lines = [row[0] for row in curr.fetchall()]
+            print(f"=== {endpoint}")
+            print("\n".join(plan_lines))
+
+            flagged = sorted(set(seq_scans(plan_lines)) & LARGE_TABLES)
+            if flagged:
+                problems += 1
+                print(f"!!! sequential scan on {', '.join(flagged)}")
+            print()
+            conn.rollback()
+    finally:
+        conn.close()
+
+    print(f"{len(queries)} queries checked, {problems} with sequential scans on large tables")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
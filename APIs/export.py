@@ -0,0 +1,45 @@
+import csv
+import io
+from typing import Any, Dict, List
+
+from APIs.responses import dumps
+
+# Tables that can be streamed through /export/{table}, with the key they are ordered by
+EXPORT_TABLES = {
+    "products": "product_id",
+    "customers": "customer_id",
+    "stores": "store_id",
+    "suppliers": "supplier_id",
+    "inventory": "inventory_id",
+    "transactions": "transaction_id",
+    "returns": "return_id",
+    "promotions": "promotion_id",
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class RowEncoder:
+    """Encodes batches of row dicts as NDJSON or CSV byte chunks, ready for StreamingResponse"""
+
+    def __init__(self, fmt: str):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.fmt = fmt
+        self.media_type = MEDIA_TYPES[fmt]
+        self._header_written = False
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        if self.fmt == "ndjson":
+            return b"".join(dumps(row) + b"\n" for row in rows)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written and rows:
+            writer.writerow(rows[0].keys())
+            self._header_written = True
+        writer.writerows(row.values() for row in rows)
+        return buffer.getvalue().encode()
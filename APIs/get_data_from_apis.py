@@ -1,10 +1,8 @@
-import requests
-import pandas as pd
-import json
 from typing import Optional, Dict, List, Any
 from datetime import datetime
+import os
 
-url = 'http://localhost:8000'
+url = os.getenv("API_URL", 'http://localhost:8000')
 endpoints = [
 "products",
 "customers",
@@ -17,6 +15,10 @@ endpoints = [
 
 
 def get_data_from_api(endpoint, params):
+    # Imported here so importing the module doesn't pull in pandas/requests
+    import pandas as pd
+    import requests
+
     response = requests.get(f'{url}/{endpoint}')
     if response.status_code == 200:
         return pd.DataFrame(response.json()['data'])
@@ -32,4 +34,6 @@ def main():
             print(f'Data from {endpoint}:', df)
         else:
             print(f'No Data From {endpoint}')
-main()
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,94 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List, Dict, Any
-import psycopg2
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Iterator
 from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from APIs.cache import LRUCache, QueryCache
+from APIs.conditional import ANALYTICS_TABLES, ConditionalGetMiddleware
+from APIs.config import DB_CONFIG
+from APIs.export import EXPORT_TABLES, RowEncoder
+from APIs.metrics import MetricsMiddleware, add_rows, metrics_response, record, timed
+from APIs.queries import (
+    batch_query, date_range_filter, list_query, lookup_query, paginate, sales_by_store_query, top_products_query
+)
+from APIs.responses import FastJSONResponse
+from APIs.db_pool import ConnectionPool, PoolTimeout
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional: gzip only
+    BrotliMiddleware = None
+
 load_dotenv()
 
+# Connection pool configuration
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# Serve queries from the async driver; DB_ASYNC=0 falls back to psycopg2 on the threadpool
+USE_ASYNC_DB = os.getenv("DB_ASYNC", "1").lower() not in ("0", "false", "no")
+if USE_ASYNC_DB:
+    # psycopg 3 is only needed by the async path
+    from psycopg_pool import PoolTimeout as AsyncPoolTimeout
+
+    from APIs.async_db import create_async_pool, execute_query_async, get_async_pool, stream_query_async
+
+# Analytics result cache, invalidated when a source table's version (data.versions) is bumped
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+SALES_BY_STORE_TTL = float(os.getenv("CACHE_TTL_SALES_BY_STORE", "300"))
+TOP_PRODUCTS_TTL = float(os.getenv("CACHE_TTL_TOP_PRODUCTS", "300"))
+
+# Rows fetched per round trip by the /export server-side cursors
+EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", "2000"))
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Most ids accepted by one batch lookup (?ids= or POST /<table>/batch)
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "1000"))
+IDS_PATTERN = r"^\d+(,\d+)*$"
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT, **DB_CONFIG)
+    return _pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the async pool on startup and close pooled connections on shutdown"""
+    if USE_ASYNC_DB:
+        async_pool = create_async_pool(DB_CONFIG, POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT)
+        await async_pool.open()
+    yield
+    if USE_ASYNC_DB:
+        await get_async_pool().close()
+    if _pool is not None:
+        _pool.closeall()
+
 app = FastAPI(
     title="Retail Data API",
     description="API for accessing retail database tables",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -24,33 +100,105 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database configuration
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5432"),
-    "database": os.getenv("DB_NAME", "your_database"),
-    "user": os.getenv("DB_USER", "your_user"),
-    "password": os.getenv("DB_PASSWORD", "your_password")
-}
+# Brotli when the client accepts it and brotli-asgi is installed, gzip otherwise
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+@app.exception_handler(PoolTimeout)
+def pool_timeout_handler(request: Request, exc: Exception):
+    """Report pool exhaustion as a retryable 503"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+if USE_ASYNC_DB:
+    app.add_exception_handler(AsyncPoolTimeout, pool_timeout_handler)
 
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    try:
+    """Context manager that borrows a pooled database connection"""
+    started = time.perf_counter()
+    with get_pool().connection() as conn:
+        record("acquire", time.perf_counter() - started)
         yield conn
-    finally:
-        conn.close()
 
 def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
     """Execute a query and return results as list of dictionaries"""
     with get_db_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query, params or ())
-            return [dict(row) for row in cur.fetchall()]
+            with timed("db"):
+                cur.execute(query, params or ())
+                rows = cur.fetchall()
+    add_rows(len(rows))
+    return [dict(row) for row in rows]
+
+def stream_query(query: str, params: tuple = None, itersize: int = 2000) -> Iterator[List[Dict[str, Any]]]:
+    """Yield result batches from a server-side cursor, holding at most `itersize` rows"""
+    with get_db_connection() as conn:
+        with conn.cursor(name="export_cursor", cursor_factory=RealDictCursor) as cur:
+            cur.itersize = itersize
+            with timed("db"):
+                cur.execute(query, params or ())
+            while True:
+                with timed("db"):
+                    rows = cur.fetchmany(itersize)
+                if not rows:
+                    break
+                add_rows(len(rows))
+                yield [dict(row) for row in rows]
+
+async def run_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    """Execute a query on the async driver, or on the sync pool via the threadpool"""
+    if USE_ASYNC_DB:
+        return await execute_query_async(query, params)
+    return await run_in_threadpool(execute_query, query, params)
+
+query_cache = QueryCache(LRUCache(CACHE_MAX_ENTRIES), run_query)
+
+# ETag / Last-Modified from the same table versions as the cache (outside compression, so a 304
+# skips compression too)
+app.add_middleware(ConditionalGetMiddleware, versions=query_cache.versions)
+
+# Added last so it is outermost: request latency covers validators, compression and all
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+async def paginated_query(
+    query: str,
+    params: list,
+    key: str,
+    limit: int,
+    offset: int,
+    after: Optional[int]
+) -> Dict[str, Any]:
+    """Run a list query with keyset (after) or offset pagination"""
+    query, params = paginate(query, params, key, limit, offset, after)
+    results = await run_query(query, tuple(params))
+    next_cursor = results[-1][key] if len(results) == limit else None
+    return {"count": len(results), "next_cursor": next_cursor, "data": results}
+
+class BatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+def parse_ids(ids: str) -> List[int]:
+    values = [int(value) for value in ids.split(",")]
+    if len(values) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    return values
+
+async def batch_lookup(table: str, key: str, ids: List[int]) -> Dict[str, Any]:
+    """Fetch many rows by primary key in one query, reporting the ids that don't exist"""
+    ids = list(dict.fromkeys(ids))
+    results = await run_query(batch_query(table, key), (ids,))
+    found = {row[key] for row in results}
+    return {
+        "count": len(results),
+        "next_cursor": None,
+        "missing": [i for i in ids if i not in found],
+        "data": results
+    }
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint with API information"""
     return {
         "message": "Retail Data API",
@@ -67,225 +215,275 @@ def root():
         }
     }
 
+@app.get("/health/pool")
+async def get_pool_stats():
+    """Connection pool size, wait time and checkout latency"""
+    if USE_ASYNC_DB:
+        return {"driver": "async", **get_async_pool().get_stats()}
+    pool = await run_in_threadpool(get_pool)
+    return {"driver": "sync", **pool.stats()}
+
 # Products endpoints
 @app.get("/products")
-def get_products(
+async def get_products(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch instead of a page"),
     category: Optional[str] = None
 ):
     """Get all products with optional filtering"""
-    query = "SELECT * FROM public.products WHERE 1=1"
-    params = []
-    
-    if category:
-        query += " AND category = %s"
-        params.append(category)
-    
-    query += " ORDER BY product_id LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
-    
-    results = execute_query(query, tuple(params))
-    return {"count": len(results), "data": results}
+    if ids:
+        return FastJSONResponse(await batch_lookup("products", "product_id", parse_ids(ids)))
+    query, params = list_query("products", category=category)
+    return FastJSONResponse(await paginated_query(query, params, "product_id", limit, offset, after))
+
+@app.post("/products/batch")
+async def get_products_batch(request: BatchRequest):
+    """Get many products by ID in one query"""
+    return FastJSONResponse(await batch_lookup("products", "product_id", request.ids))
 
 @app.get("/products/{product_id}")
-def get_product(product_id: int):
+async def get_product(product_id: int):
     """Get a specific product by ID"""
-    query = "SELECT * FROM public.products WHERE product_id = %s"
-    results = execute_query(query, (product_id,))
+    results = await run_query(lookup_query("products", "product_id"), (product_id,))
     
     if not results:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return results[0]
+    return FastJSONResponse(results[0])
 
 # Customers endpoints
 @app.get("/customers")
-def get_customers(
+async def get_customers(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch instead of a page")
 ):
     """Get all customers"""
-    query = "SELECT * FROM public.customers ORDER BY customer_id LIMIT %s OFFSET %s"
-    results = execute_query(query, (limit, offset))
-    return {"count": len(results), "data": results}
+    if ids:
+        return FastJSONResponse(await batch_lookup("customers", "customer_id", parse_ids(ids)))
+    query, params = list_query("customers")
+    return FastJSONResponse(await paginated_query(query, params, "customer_id", limit, offset, after))
+
+@app.post("/customers/batch")
+async def get_customers_batch(request: BatchRequest):
+    """Get many customers by ID in one query"""
+    return FastJSONResponse(await batch_lookup("customers", "customer_id", request.ids))
 
 @app.get("/customers/{customer_id}")
-def get_customer(customer_id: int):
+async def get_customer(customer_id: int):
     """Get a specific customer by ID"""
-    query = "SELECT * FROM public.customers WHERE customer_id = %s"
-    results = execute_query(query, (customer_id,))
+    results = await run_query(lookup_query("customers", "customer_id"), (customer_id,))
     
     if not results:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    return results[0]
+    return FastJSONResponse(results[0])
 
 # Stores endpoints
 @app.get("/stores")
-def get_stores(
+async def get_stores(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch instead of a page")
 ):
     """Get all stores"""
-    query = "SELECT * FROM public.stores ORDER BY store_id LIMIT %s OFFSET %s"
-    results = execute_query(query, (limit, offset))
-    return {"count": len(results), "data": results}
+    if ids:
+        return FastJSONResponse(await batch_lookup("stores", "store_id", parse_ids(ids)))
+    query, params = list_query("stores")
+    return FastJSONResponse(await paginated_query(query, params, "store_id", limit, offset, after))
+
+@app.post("/stores/batch")
+async def get_stores_batch(request: BatchRequest):
+    """Get many stores by ID in one query"""
+    return FastJSONResponse(await batch_lookup("stores", "store_id", request.ids))
 
 @app.get("/stores/{store_id}")
-def get_store(store_id: int):
+async def get_store(store_id: int):
     """Get a specific store by ID"""
-    query = "SELECT * FROM public.stores WHERE store_id = %s"
-    results = execute_query(query, (store_id,))
+    results = await run_query(lookup_query("stores", "store_id"), (store_id,))
     
     if not results:
         raise HTTPException(status_code=404, detail="Store not found")
     
-    return results[0]
+    return FastJSONResponse(results[0])
 
 # Suppliers endpoints
 @app.get("/suppliers")
-def get_suppliers(
+async def get_suppliers(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch instead of a page")
 ):
     """Get all suppliers"""
-    query = "SELECT * FROM public.suppliers ORDER BY supplier_id LIMIT %s OFFSET %s"
-    results = execute_query(query, (limit, offset))
-    return {"count": len(results), "data": results}
+    if ids:
+        return FastJSONResponse(await batch_lookup("suppliers", "supplier_id", parse_ids(ids)))
+    query, params = list_query("suppliers")
+    return FastJSONResponse(await paginated_query(query, params, "supplier_id", limit, offset, after))
+
+@app.post("/suppliers/batch")
+async def get_suppliers_batch(request: BatchRequest):
+    """Get many suppliers by ID in one query"""
+    return FastJSONResponse(await batch_lookup("suppliers", "supplier_id", request.ids))
 
 @app.get("/suppliers/{supplier_id}")
-def get_supplier(supplier_id: int):
+async def get_supplier(supplier_id: int):
     """Get a specific supplier by ID"""
-    query = "SELECT * FROM public.suppliers WHERE supplier_id = %s"
-    results = execute_query(query, (supplier_id,))
+    results = await run_query(lookup_query("suppliers", "supplier_id"), (supplier_id,))
     
     if not results:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
-    return results[0]
+    return FastJSONResponse(results[0])
 
 # Inventory endpoints
 @app.get("/inventory")
-def get_inventory(
+async def get_inventory(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
     store_id: Optional[int] = None,
     product_id: Optional[int] = None
 ):
     """Get inventory with optional filtering"""
-    query = "SELECT * FROM public.inventory WHERE 1=1"
-    params = []
-    
-    if store_id:
-        query += " AND store_id = %s"
-        params.append(store_id)
-    
-    if product_id:
-        query += " AND product_id = %s"
-        params.append(product_id)
-    
-    query += " ORDER BY inventory_id LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
-    
-    results = execute_query(query, tuple(params))
-    return {"count": len(results), "data": results}
+    query, params = list_query("inventory", store_id=store_id, product_id=product_id)
+    return FastJSONResponse(await paginated_query(query, params, "inventory_id", limit, offset, after))
 
 # Transactions endpoints
 @app.get("/transactions")
-def get_transactions(
+async def get_transactions(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch instead of a page"),
     customer_id: Optional[int] = None,
-    store_id: Optional[int] = None
+    store_id: Optional[int] = None,
+    start_date: Optional[date] = Query(None, description="First transaction_date included"),
+    end_date: Optional[date] = Query(None, description="Last transaction_date included")
 ):
     """Get transactions with optional filtering"""
-    query = "SELECT * FROM public.transactions WHERE 1=1"
-    params = []
-    
-    if customer_id:
-        query += " AND customer_id = %s"
-        params.append(customer_id)
-    
-    if store_id:
-        query += " AND store_id = %s"
-        params.append(store_id)
-    
-    query += " ORDER BY transaction_id LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
+    if ids:
+        return FastJSONResponse(await batch_lookup("transactions", "transaction_id", parse_ids(ids)))
+    query, params = list_query("transactions", customer_id=customer_id, store_id=store_id)
+
+    # transactions is partitioned by month on transaction_date: a date range only reads its months
+    dates, date_params = date_range_filter("transaction_date", start_date, end_date)
+    query += dates
+    params.extend(date_params)
     
-    results = execute_query(query, tuple(params))
-    return {"count": len(results), "data": results}
+    return FastJSONResponse(await paginated_query(query, params, "transaction_id", limit, offset, after))
+
+@app.post("/transactions/batch")
+async def get_transactions_batch(request: BatchRequest):
+    """Get many transactions by ID in one query"""
+    return FastJSONResponse(await batch_lookup("transactions", "transaction_id", request.ids))
 
 @app.get("/transactions/{transaction_id}")
-def get_transaction(transaction_id: int):
+async def get_transaction(transaction_id: int):
     """Get a specific transaction by ID"""
-    query = "SELECT * FROM public.transactions WHERE transaction_id = %s"
-    results = execute_query(query, (transaction_id,))
+    results = await run_query(lookup_query("transactions", "transaction_id"), (transaction_id,))
     
     if not results:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    return results[0]
+    return FastJSONResponse(results[0])
 
 # Returns endpoints
 @app.get("/returns")
-def get_returns(
+async def get_returns(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0)
 ):
     """Get all returns"""
-    query = "SELECT * FROM public.returns ORDER BY return_id LIMIT %s OFFSET %s"
-    results = execute_query(query, (limit, offset))
-    return {"count": len(results), "data": results}
+    query, params = list_query("returns")
+    return FastJSONResponse(await paginated_query(query, params, "return_id", limit, offset, after))
 
 # Promotions endpoints
 @app.get("/promotions")
-def get_promotions(
+async def get_promotions(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, ge=0)
 ):
     """Get all promotions"""
-    query = "SELECT * FROM public.promotions ORDER BY promotion_id LIMIT %s OFFSET %s"
-    results = execute_query(query, (limit, offset))
-    return {"count": len(results), "data": results}
+    query, params = list_query("promotions")
+    return FastJSONResponse(await paginated_query(query, params, "promotion_id", limit, offset, after))
 
 # Analytics endpoints
 @app.get("/analytics/sales-by-store")
-def get_sales_by_store():
-    """Get total sales grouped by store"""
-    query = """
-        SELECT 
-            s.store_id,
-            s.store_name,
-            COUNT(t.transaction_id) as transaction_count,
-            SUM(t.total_amount) as total_sales
-        FROM public.stores s
-        LEFT JOIN public.transactions t ON s.store_id = t.store_id
-        GROUP BY s.store_id, s.store_name
-        ORDER BY total_sales DESC
-    """
-    results = execute_query(query)
-    return {"data": results}
+async def get_sales_by_store(
+    start_date: Optional[date] = Query(None, description="First sales day included"),
+    end_date: Optional[date] = Query(None, description="Last sales day included")
+):
+    """Get total sales grouped by store, over all history or a date range"""
+    query, params = sales_by_store_query(start_date, end_date)
+    results = await query_cache.fetch(query, tuple(params), SALES_BY_STORE_TTL, ANALYTICS_TABLES["sales-by-store"])
+    return FastJSONResponse({"data": results})
 
 @app.get("/analytics/top-products")
-def get_top_products(limit: int = Query(10, ge=1, le=100)):
-    """Get top selling products"""
-    query = """
-        SELECT 
-            p.product_id,
-            p.product_name,
-            p.category,
-            COUNT(t.transaction_id) as sales_count,
-            SUM(t.total_amount) as total_revenue
-        FROM public.products p
-        LEFT JOIN public.transactions t ON p.product_id = t.product_id
-        GROUP BY p.product_id, p.product_name, p.category
-        ORDER BY sales_count DESC
-        LIMIT %s
-    """
-    results = execute_query(query, (limit,))
-    return {"data": results}
+async def get_top_products(
+    limit: int = Query(10, ge=1, le=100),
+    start_date: Optional[date] = Query(None, description="First sales day included"),
+    end_date: Optional[date] = Query(None, description="Last sales day included")
+):
+    """Get top selling products, over all history or a date range"""
+    query, params = top_products_query(limit, start_date, end_date)
+    results = await query_cache.fetch(query, tuple(params), TOP_PRODUCTS_TTL, ANALYTICS_TABLES["top-products"])
+    return FastJSONResponse({"data": results})
+
+# Export endpoints
+@app.get("/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$")
+):
+    """Stream a whole table as NDJSON or CSV without materializing it"""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    query = f"SELECT * FROM public.{table} ORDER BY {EXPORT_TABLES[table]}"
+    encoder = RowEncoder(format)
+
+    if USE_ASYNC_DB:
+        async def body():
+            async for rows in stream_query_async(query, (), EXPORT_ITERSIZE):
+                with timed("serialize"):
+                    chunk = encoder.encode(rows)
+                yield chunk
+    else:
+        # Sync generators are iterated on the threadpool by StreamingResponse
+        def body():
+            for rows in stream_query(query, (), EXPORT_ITERSIZE):
+                with timed("serialize"):
+                    chunk = encoder.encode(rows)
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics: per-route latency, pool wait, query and serialization time, rows"""
+    return metrics_response()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Analytics result cache hit/miss counters"""
+    return query_cache.backend.stats()
+
+@app.post("/cache/invalidate")
+async def invalidate_cache():
+    """Drop every cached analytics result"""
+    query_cache.invalidate()
+    return {"invalidated": True}
 
 if __name__ == "__main__":
     import uvicorn
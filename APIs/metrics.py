@@ -0,0 +1,151 @@
+import contextvars
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest
+from starlette.responses import Response
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds", "Request latency, from the first middleware to the last body byte",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+ACQUIRE_TIME = Histogram(
+    "api_pool_acquire_duration_seconds", "Time per request spent waiting for a pooled connection",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+DB_TIME = Histogram(
+    "api_db_duration_seconds", "Time per request spent executing queries and fetching rows",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+SERIALIZATION_TIME = Histogram(
+    "api_serialization_duration_seconds", "Time per request spent encoding the response body",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+ROWS_RETURNED = Histogram(
+    "api_rows_returned", "Rows fetched from the database per request", ["route"], buckets=ROW_BUCKETS,
+)
+
+
+@dataclass
+class RequestTimings:
+    """Where one request's time went, summed over every query and render it did"""
+
+    acquire: float = 0.0
+    db: float = 0.0
+    serialize: float = 0.0
+    rows: int = 0
+
+
+# Set by MetricsMiddleware for the request being served; None outside a request
+# (pool warm-up, scripts). The threadpool and streaming tasks run on a copy of the
+# context, which still points at the same RequestTimings.
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def record(phase: str, seconds: float):
+    """Add `seconds` to the current request's acquire, db or serialize time"""
+    timings = _current.get()
+    if timings is not None:
+        setattr(timings, phase, getattr(timings, phase) + seconds)
+
+
+def add_rows(count: int):
+    timings = _current.get()
+    if timings is not None:
+        timings.rows += count
+
+
+@contextmanager
+def timed(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+def route_template(scope, routes) -> str:
+    """The matched route's path template, so /products/1 and /products/2 share a series"""
+    route = scope.get("route")
+    if route is None:
+        # Answered before routing (a 304 from ConditionalGetMiddleware, a CORS preflight)
+        for candidate in routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """Per-route latency, with the time split into pool wait, queries and serialization.
+
+    Also logs one JSON line per request (at INFO on APIs.metrics) with the same
+    figures, so a slow dashboard can be traced to its query or its encoding.
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            route = route_template(scope, self.routes)
+            REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(elapsed)
+            ACQUIRE_TIME.labels(route).observe(timings.acquire)
+            DB_TIME.labels(route).observe(timings.db)
+            SERIALIZATION_TIME.labels(route).observe(timings.serialize)
+            ROWS_RETURNED.labels(route).observe(timings.rows)
+            logger.info(json.dumps({
+                "method": scope["method"],
+                "route": route,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 3),
+                "acquire_ms": round(timings.acquire * 1000, 3),
+                "db_ms": round(timings.db * 1000, 3),
+                "serialize_ms": round(timings.serialize * 1000, 3),
+                "rows": timings.rows,
+            }))
+
+
+def metrics_response() -> Response:
+    """Prometheus exposition of the metrics above (plus the process/GC defaults)"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Several uvicorn/gunicorn workers: aggregate the per-process files
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
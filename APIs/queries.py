@@ -0,0 +1,119 @@
+"""SQL built by the API routes, kept apart from the app so APIs.explain_queries
+checks the plans of exactly the queries the routes run.
+
+Every builder returns (query, params) and touches no connection.
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+Sql = Tuple[str, List[Any]]
+
+# List endpoints and the columns each one filters on by equality
+LIST_FILTERS: Dict[str, List[str]] = {
+    "products": ["category"],
+    "customers": [],
+    "stores": [],
+    "suppliers": [],
+    "inventory": ["store_id", "product_id"],
+    "transactions": ["customer_id", "store_id"],
+    "returns": [],
+    "promotions": [],
+}
+
+# Tables with /<table>/{id}, ?ids= and POST /<table>/batch lookups
+LOOKUP_TABLES = ["products", "customers", "stores", "suppliers", "transactions"]
+
+
+def list_query(table: str, **filters: Any) -> Sql:
+    """Unordered SELECT for a list endpoint; filters left empty (None, 0, "") are not applied"""
+    unknown = set(filters) - set(LIST_FILTERS[table])
+    if unknown:
+        raise ValueError(f"{table} has no list filter {', '.join(sorted(unknown))}")
+    query, params = f"SELECT * FROM public.{table} WHERE 1=1", []
+    for column, value in filters.items():
+        if value:
+            query += f" AND {column} = %s"
+            params.append(value)
+    return query, params
+
+
+def date_range_filter(column: str, start_date: Optional[date], end_date: Optional[date]) -> Tuple[str, List[Any]]:
+    """SQL conditions and params for an inclusive start_date..end_date filter on `column`"""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date must be on or before end_date")
+    query, params = "", []
+    if start_date:
+        query += f" AND {column} >= %s"
+        params.append(start_date)
+    if end_date:
+        query += f" AND {column} <= %s"
+        params.append(end_date)
+    return query, params
+
+
+def paginate(query: str, params: List[Any], key: str, limit: int, offset: int, after: Optional[int]) -> Sql:
+    """Order a list query by `key` and page it with keyset (after) or offset pagination"""
+    if after is not None:
+        # Keyset mode: seek past the last seen key instead of skipping rows
+        return f"{query} AND {key} > %s ORDER BY {key} LIMIT %s", [*params, after, limit]
+    return f"{query} ORDER BY {key} LIMIT %s OFFSET %s", [*params, limit, offset]
+
+
+def lookup_query(table: str, key: str) -> str:
+    return f"SELECT * FROM public.{table} WHERE {key} = %s"
+
+
+def batch_query(table: str, key: str) -> str:
+    return f"SELECT * FROM public.{table} WHERE {key} = ANY(%s) ORDER BY {key}"
+
+
+def sales_by_store_query(start_date: Optional[date], end_date: Optional[date]) -> Sql:
+    # Reads the rollups maintained by the loaders instead of aggregating raw transactions
+    rollup = "public.store_sales_rollup"
+    dates, params = date_range_filter("sales_date", start_date, end_date)
+    if dates:
+        # Daily grain: sums at most stores x days rows, whatever the transaction volume
+        rollup = f"""(
+            SELECT store_id, SUM(transaction_count)::BIGINT AS transaction_count, SUM(total_sales) AS total_sales
+            FROM public.store_daily_sales_rollup
+            WHERE 1=1{dates}
+            GROUP BY store_id
+        )"""
+    query = f"""
+        SELECT
+            s.store_id,
+            s.store_name,
+            COALESCE(r.transaction_count, 0) as transaction_count,
+            COALESCE(r.total_sales, 0) as total_sales
+        FROM public.stores s
+        LEFT JOIN {rollup} r ON s.store_id = r.store_id
+        ORDER BY total_sales DESC
+    """
+    return query, params
+
+
+def top_products_query(limit: int, start_date: Optional[date], end_date: Optional[date]) -> Sql:
+    rollup = "public.product_sales_rollup"
+    dates, params = date_range_filter("sales_date", start_date, end_date)
+    if dates:
+        rollup = f"""(
+            SELECT product_id, SUM(sales_count)::BIGINT AS sales_count, SUM(total_revenue) AS total_revenue
+            FROM public.product_daily_sales_rollup
+            WHERE 1=1{dates}
+            GROUP BY product_id
+        )"""
+    query = f"""
+        SELECT
+            p.product_id,
+            p.product_name,
+            p.category,
+            COALESCE(r.sales_count, 0) as sales_count,
+            COALESCE(r.total_revenue, 0) as total_revenue
+        FROM public.products p
+        LEFT JOIN {rollup} r ON p.product_id = r.product_id
+        ORDER BY sales_count DESC
+        LIMIT %s
+    """
+    return query, [*params, limit]
@@ -0,0 +1,30 @@
+import decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from APIs.metrics import timed
+
+
+def _orjson_default(value: Any):
+    # orjson handles dates, datetimes, UUIDs and NumPy natively; Decimal (NUMERIC columns) is left
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    Routes return it directly with rows straight from the cursor, which skips
+    FastAPI's jsonable_encoder pass over every value.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
@@ -0,0 +1,136 @@
+"""Concurrent HTTP load generator for the retail API.
+
+Compare the sync (psycopg2 + threadpool) and async (psycopg 3) query paths:
+
+    python -m benchmarks.bench_api --compare --concurrency 200 --requests 5000
+
+or drive an already running server:
+
+    python -m benchmarks.bench_api --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/products?limit=100",
+    "/transactions?limit=1000",
+    "/customers?limit=100&offset=100",
+    "/analytics/sales-by-store",
+    "/analytics/top-products?limit=10",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load(base_url: str, paths: List[str], total: int, concurrency: int) -> Dict[str, Any]:
+    """Issue `total` GETs round-robin over `paths` with `concurrency` in flight"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(async_db: bool, env: Optional[Dict[str, str]] = None) -> tuple:
+    """Start one uvicorn worker with the requested query path and wait until it answers"""
+    port = free_port()
+    env = dict(os.environ, DB_ASYNC="1" if async_db else "0", **(env or {}))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "APIs.hosting_apis:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API server did not start within 30s")
+
+
+def bench_mode(async_db: bool, args) -> Dict[str, Any]:
+    proc, url = start_server(async_db)
+    try:
+        # Warm the pool before measuring
+        asyncio.run(run_load(url, args.paths, min(args.requests, args.concurrency), args.concurrency))
+        return asyncio.run(run_load(url, args.paths, args.requests, args.concurrency))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark an already running server instead of spawning one")
+    parser.add_argument("--compare", action="store_true", help="Spawn sync and async servers and compare them")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--path", dest="paths", action="append", help="Path to request (repeatable)")
+    args = parser.parse_args(argv)
+    args.paths = args.paths or DEFAULT_PATHS
+
+    if args.url:
+        results = {"server": asyncio.run(run_load(args.url, args.paths, args.requests, args.concurrency))}
+    elif args.compare:
+        results = {"sync": bench_mode(False, args), "async": bench_mode(True, args)}
+    else:
+        results = {"async": bench_mode(True, args)}
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare CSV and binary COPY for the loader's large tables.
+
+Encodes the same seeded CSV chunks both ways. With --db, each stream is also
+COPYed into a temporary table, so server-side parsing is included and nothing
+persists:
+
+    python -m benchmarks.bench_copy --transactions 5000000 --db
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+from data import data_gen
+from data.ingest_data import chunk_stream, connect, read_csv_chunks, read_csv_header
+from data.schema import create_table_sql
+
+from benchmarks.bench_formats import drain
+
+DEFAULT_TABLES = ["transactions", "inventory"]
+
+
+def encode_only(table: str, path: str, chunk_rows: int, copy_format: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    stream = chunk_stream(table, read_csv_chunks(table, path, chunk_rows), copy_format=copy_format)
+    copy_bytes = drain(stream)
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": stream.rows,
+        "encode_s": round(elapsed, 3),
+        "rows_per_s": round(stream.rows / elapsed) if elapsed else 0,
+        "copy_mb": round(copy_bytes / 1e6, 1),
+    }
+
+
+def copy_to_temp_table(conn, table: str, path: str, chunk_rows: int, copy_format: str) -> Dict[str, Any]:
+    curr = conn.cursor()
+    curr.execute(create_table_sql("pg_temp", table, extra_columns=[("load_date", "TIMESTAMP")]))
+    columns = read_csv_header(path)
+    stream = chunk_stream(table, read_csv_chunks(table, path, chunk_rows), copy_format=copy_format)
+    started = time.perf_counter()
+    curr.copy_expert(f"""
+        COPY pg_temp.{table} ({', '.join(columns)})
+        FROM STDIN
+        WITH {stream.copy_options}
+    """, stream, size=1024 * 1024)
+    elapsed = time.perf_counter() - started
+    conn.rollback()  # drops the temporary table
+    curr.close()
+    return {"copy_s": round(elapsed, 3), "rows_per_s": round(stream.rows / elapsed) if elapsed else 0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--inventory", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows in the other generated tables")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--table", dest="tables", action="append", help="Table to compare (repeatable)")
+    parser.add_argument("--data-dir", help="Reuse CSVs in this directory instead of generating")
+    parser.add_argument("--db", action="store_true", help="Also COPY into a temporary table (uses DB_* env)")
+    args = parser.parse_args(argv)
+    tables = args.tables or DEFAULT_TABLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        if not args.data_dir:
+            data_gen.main([
+                "--seed", str(args.seed), "--rows", str(args.rows), "--transactions", str(args.transactions),
+                "--inventory", str(args.inventory), "--output-dir", data_dir,
+            ])
+
+        conn = connect() if args.db else None
+        results = {}
+        try:
+            for table in tables:
+                path = os.path.join(data_dir, f"{table}.csv")
+                results[table] = {}
+                for copy_format in ["csv", "binary"]:
+                    result = encode_only(table, path, args.chunk_rows, copy_format)
+                    if conn:
+                        result["db"] = copy_to_temp_table(conn, table, path, args.chunk_rows, copy_format)
+                    results[table][copy_format] = result
+        finally:
+            if conn:
+                conn.close()
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare the CSV and Parquet inputs of data/ingest_data.py: file size and encode throughput.
+
+Generates the same seeded dataset in both formats, then drains the COPY streams the
+loader would send (pandas read_csv -> to_csv vs Parquet row groups -> pyarrow CSV)
+without a database, so only the client-side parse/encode cost is measured:
+
+    python -m benchmarks.bench_formats --transactions 5000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+from data import data_gen
+from data.ingest_data import chunk_stream, parquet_stream, read_csv_chunks
+from data.parquet_source import parquet_path
+from data.schema import TABLES
+
+DEFAULT_TABLES = ["transactions", "returns", "inventory"]
+
+
+def path_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def drain(stream, read_size: int = 1024 * 1024) -> int:
+    """Read a COPY stream to the end, as copy_expert would, returning the bytes produced"""
+    total = 0
+    while True:
+        data = stream.read(read_size)
+        if not data:
+            return total
+        total += len(data)
+
+
+def time_stream(make_stream) -> Dict[str, Any]:
+    started = time.perf_counter()
+    stream = make_stream()
+    copy_bytes = drain(stream)
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": stream.rows,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(stream.rows / elapsed) if elapsed else 0,
+        "copy_mb": round(copy_bytes / 1e6, 1),
+    }
+
+
+def bench_table(table: str, data_dir: str, chunk_rows: int) -> Dict[str, Any]:
+    csv_path = os.path.join(data_dir, "csv", f"{table}.csv")
+    parquet = parquet_path(os.path.join(data_dir, "parquet"), table)
+    columns = TABLES[table].column_names
+    return {
+        "csv_mb": round(path_size(csv_path) / 1e6, 1),
+        "parquet_mb": round(path_size(parquet) / 1e6, 1),
+        "csv": time_stream(lambda: chunk_stream(table, read_csv_chunks(table, csv_path, chunk_rows))),
+        "parquet": time_stream(lambda: parquet_stream(table, parquet, columns, chunk_rows)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows in the other generated tables")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--table", dest="tables", action="append", help="Table to compare (repeatable)")
+    parser.add_argument("--data-dir", help="Reuse <dir>/csv and <dir>/parquet instead of generating")
+    args = parser.parse_args(argv)
+    tables = args.tables or DEFAULT_TABLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        if not args.data_dir:
+            for fmt in ["csv", "parquet"]:
+                data_gen.main([
+                    "--seed", str(args.seed), "--rows", str(args.rows), "--transactions", str(args.transactions),
+                    "--format", fmt, "--output-dir", os.path.join(data_dir, fmt),
+                ])
+        results = {table: bench_table(table, data_dir, args.chunk_rows) for table in tables}
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Serialization cost and response size of a list page, before and after FastJSONResponse.
+
+"before" is what FastAPI does with a returned dict: jsonable_encoder over every
+value, then stdlib json. "after" is orjson straight from the cursor rows. Sizes
+are reported raw, gzipped (as GZipMiddleware sends them) and brotli-compressed
+when the brotli module is installed:
+
+    python -m benchmarks.bench_serialization --rows 1000
+"""
+import argparse
+import datetime
+import decimal
+import gzip
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from APIs.responses import FastJSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def sample_rows(n: int) -> List[Dict[str, Any]]:
+    """Rows shaped like RealDictCursor output for /transactions"""
+    day = datetime.date(2024, 1, 1)
+    loaded = datetime.datetime(2024, 6, 1, 12, 30)
+    return [
+        {
+            "transaction_id": i,
+            "customer_id": i % 5000 + 1,
+            "product_id": i % 800 + 1,
+            "store_id": i % 50 + 1,
+            "quantity": i % 5 + 1,
+            "transaction_date": day + datetime.timedelta(days=i % 365),
+            "total_amount": decimal.Decimal(f"{(i % 9000) / 7:.2f}"),
+            "load_date": loaded,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def stdlib_render(content: Any) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_render(content: Any) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def time_render(render: Callable[[Any], bytes], content: Any, repeat: int) -> Dict[str, Any]:
+    body = render(content)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(content)
+    per_page = (time.perf_counter() - started) / repeat
+    sizes = {"raw": len(body), "gzip": len(gzip.compress(body, compresslevel=9))}
+    if brotli is not None:
+        sizes["brotli"] = len(brotli.compress(body))
+    return {"ms_per_page": round(per_page * 1000, 3), "bytes": sizes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    rows = sample_rows(args.rows)
+    content = {"count": len(rows), "next_cursor": rows[-1]["transaction_id"], "data": rows}
+    before = time_render(stdlib_render, content, args.repeat)
+    after = time_render(fast_render, content, args.repeat)
+    results = {
+        "rows": args.rows,
+        "before": before,
+        "after": after,
+        "speedup": round(before["ms_per_page"] / after["ms_per_page"], 1) if after["ms_per_page"] else None,
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
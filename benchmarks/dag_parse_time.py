@@ -0,0 +1,95 @@
+"""Check that every file in dags/ parses within a time budget, without I/O.
+
+The Airflow scheduler re-imports DAG files continuously, so each file is parsed
+the way the scheduler does it: in a fresh interpreter with Airflow already
+imported (its own import cost is paid once per parser process, not per file).
+A file fails if it takes longer than the budget, opens a network connection
+(Postgres or the API) while importing, or pulls in a heavy library that only
+tasks need:
+
+    python -m benchmarks.dag_parse_time --budget 0.5
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_S = 0.5
+DAGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dags")
+
+# Only task code should need these; importing them at parse time costs every parse loop
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "psycopg2", "psycopg", "requests", "httpx", "faker"]
+
+# Runs in the child interpreter: import Airflow, forbid sockets, then time the DAG file alone
+PARSE_SCRIPT = """
+import json, runpy, socket, sys, time
+
+import airflow
+import airflow.sdk
+
+preloaded = set(sys.modules)
+
+def refuse(self, address):
+    raise RuntimeError(f"network connection to {address} while parsing")
+
+socket.socket.connect = refuse
+socket.socket.connect_ex = refuse
+
+started = time.perf_counter()
+error = None
+try:
+    runpy.run_path(sys.argv[1], run_name="dag_parse_check")
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - started
+
+new_modules = {name.split(".")[0] for name in set(sys.modules) - preloaded}
+print(json.dumps({"elapsed_s": elapsed, "error": error, "new_modules": sorted(new_modules)}))
+"""
+
+
+def parse_dag_file(path: str) -> dict:
+    repo_root = os.path.dirname(DAGS_DIR)
+    # Airflow puts the DAGs folder on sys.path; the DAGs also import the repo's packages
+    search_path = [os.path.dirname(os.path.abspath(path)), repo_root, os.environ.get("PYTHONPATH")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, search_path)))
+    proc = subprocess.run(
+        [sys.executable, "-c", PARSE_SCRIPT, path], capture_output=True, text=True, env=env, cwd=repo_root
+    )
+    if proc.returncode != 0:
+        return {"elapsed_s": None, "error": proc.stderr.strip().splitlines()[-1], "new_modules": []}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="Seconds allowed per DAG file")
+    parser.add_argument("--dags-dir", default=DAGS_DIR)
+    args = parser.parse_args(argv)
+
+    results, failures = {}, 0
+    for path in sorted(glob.glob(os.path.join(args.dags_dir, "*.py"))):
+        result = parse_dag_file(path)
+        heavy = sorted(set(result["new_modules"]) & set(HEAVY_MODULES))
+        problems = []
+        if result["error"]:
+            problems.append(result["error"])
+        if result["elapsed_s"] is not None and result["elapsed_s"] > args.budget:
+            problems.append(f"parse took {result['elapsed_s']:.3f}s (budget {args.budget}s)")
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)} at parse time")
+        failures += bool(problems)
+        results[os.path.basename(path)] = {
+            "elapsed_s": None if result["elapsed_s"] is None else round(result["elapsed_s"], 4),
+            "problems": problems,
+        }
+
+    print(json.dumps(results, indent=2))
+    print(f"{len(results)} DAG files checked, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""End-to-end benchmark: generator, both loaders and the API, at several scales.
+
+For each scale (transaction count) the suite:
+
+1. generates the dataset with data/data_gen.py
+2. with --db, loads it with data/ingest_data.py into the DB_* database, starts
+   the API on it and drives list, point-lookup, deep-offset and analytics
+   routes concurrently, then extracts every endpoint with APIs/data_ingestion.py
+
+Analytics are measured twice: warm, answered from the API's result cache, and
+cold, on a second server with the cache disabled so every request runs the
+rollup queries.
+
+Every step runs in its own interpreter, so its peak RSS is its own. Results
+(throughput, p50/p99 latency, peak RSS) are printed as JSON and compared with a
+stored baseline; a metric worse than the baseline by more than --tolerance is a
+regression and makes the run exit 1.
+
+--db DROPS the retail tables in public and apis first: point DB_* at a scratch
+database.
+
+    python -m benchmarks.run_suite --scale 10k --scale 1m --db --output results.json
+    python -m benchmarks.run_suite --scale 10k --db --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bench_api import run_load, start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_TOLERANCE = 0.2
+
+ANALYTICS_PATHS = ["/analytics/sales-by-store", "/analytics/top-products?limit=10"]
+# CACHE_MAX_ENTRIES=0 evicts every result as soon as it is stored: each request runs its query
+NO_RESULT_CACHE = {"CACHE_MAX_ENTRIES": "0"}
+
+# Direction of each compared metric; anything else in the results is informational
+HIGHER_IS_BETTER = {"rows_per_s", "requests_per_s"}
+LOWER_IS_BETTER = {"elapsed_s", "p50_ms", "p99_ms", "peak_rss_mb", "server_peak_rss_mb"}
+
+# Runs in the child interpreter: call module.function(**kwargs), report time and peak RSS
+STEP_SCRIPT = """
+import importlib, json, resource, sys, time
+
+module, function = sys.argv[1].split(":")
+kwargs = json.loads(sys.argv[2])
+func = getattr(importlib.import_module(module), function)
+
+started = time.perf_counter()
+result = func(**kwargs)
+elapsed = time.perf_counter() - started
+
+# ru_maxrss is in KiB on Linux, bytes on macOS; children covers the generator's worker processes
+scale = 1024 if sys.platform == "darwin" else 1
+peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+print(json.dumps({"elapsed_s": elapsed, "result": result, "peak_rss_mb": peak * scale / 1024}))
+"""
+
+
+def run_step(target: str, env: Optional[Dict[str, str]] = None, **kwargs) -> Dict[str, Any]:
+    """Run `module:function` with keyword arguments in a fresh interpreter"""
+    proc = subprocess.run(
+        [sys.executable, "-c", STEP_SCRIPT, target, json.dumps(kwargs)],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=dict(os.environ, PYTHONPATH=REPO_ROOT, **(env or {})),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} failed:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def step_summary(step: Dict[str, Any], rows: int) -> Dict[str, Any]:
+    elapsed = step["elapsed_s"]
+    return {
+        "rows": rows,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(rows / elapsed) if elapsed else 0,
+        "peak_rss_mb": round(step["peak_rss_mb"], 1),
+    }
+
+
+def route_groups(transactions: int, dimension_rows: int) -> Dict[str, List[str]]:
+    """Paths per route class, with ids and offsets that exist at this scale"""
+    return {
+        "list": ["/products?limit=100", "/transactions?limit=1000", "/customers?limit=100"],
+        "point": [
+            f"/products/{dimension_rows // 2 or 1}",
+            f"/customers/{dimension_rows // 3 or 1}",
+            f"/transactions/{transactions // 2 or 1}",
+        ],
+        "deep_offset": [
+            f"/transactions?limit=100&offset={max(0, transactions - 1000)}",
+            f"/customers?limit=100&offset={max(0, dimension_rows - 200)}",
+        ],
+        "analytics_warm": ANALYTICS_PATHS,
+    }
+
+
+def peak_rss_of(pid: int) -> Optional[float]:
+    """High-water RSS of a running process in MB (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def reset_database():
+    """Drop everything the loaders create, so each scale loads from scratch"""
+    from data.ingest_data import STATE_TABLE, connect
+    from data.rollups import ROLLUP_TABLES
+    from data.schema import TABLES
+    from data.versions import VERSIONS_TABLE
+
+    from APIs.data_ingestion import EXTRACT_STATE_TABLE
+
+    conn = connect()
+    try:
+        curr = conn.cursor()
+        tables = [f"{schema}.{table}" for schema in ("public", "apis") for table in TABLES]
+        tables += [f"public.{table}" for table in ROLLUP_TABLES] + [STATE_TABLE, EXTRACT_STATE_TABLE, VERSIONS_TABLE]
+        for table in tables:
+            curr.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def bench_api(args, transactions: int) -> Dict[str, Any]:
+    proc, url = start_server(async_db=True)
+    try:
+        results = {}
+        for group, paths in route_groups(transactions, args.rows).items():
+            # Warm the pool and caches before measuring each route class
+            asyncio.run(run_load(url, paths, args.concurrency, args.concurrency))
+            results[group] = asyncio.run(run_load(url, paths, args.requests, args.concurrency))
+        results["server_peak_rss_mb"] = peak_rss_of(proc.pid)
+
+        # The extractor pages through the API, so it runs while the server is up
+        step = run_step("APIs.data_ingestion:extract_all", env={"API_URL": url})
+        results["data_ingestion"] = step_summary(step, sum(step["result"].values()))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    proc, url = start_server(async_db=True, env=NO_RESULT_CACHE)
+    try:
+        # Warms the pool only: nothing is cached, so these are the rollup queries themselves
+        asyncio.run(run_load(url, ANALYTICS_PATHS, args.concurrency, args.concurrency))
+        results["analytics_cold"] = asyncio.run(run_load(url, ANALYTICS_PATHS, args.requests, args.concurrency))
+        return results
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run_scale(args, transactions: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as data_dir:
+        step = run_step("data.data_gen:main", argv=[
+            "--seed", str(args.seed), "--rows", str(args.rows), "--transactions", str(transactions),
+            "--inventory", str(args.rows), "--output-dir", data_dir,
+        ])
+        results = {"generate": step_summary(step, sum(step["result"].values()))}
+        if not args.db:
+            return results
+
+        reset_database()
+        step = run_step("data.ingest_data:load_all", data_dir=data_dir)
+        results["ingest_data"] = step_summary(step, sum(step["result"].values()))
+        results["api"] = bench_api(args, transactions)
+        return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, path: str = "") -> List[str]:
+    """Metrics worse than the baseline by more than `tolerance` (a fraction)"""
+    regressions = []
+    for key, expected in baseline.items():
+        actual = results.get(key)
+        where = f"{path}.{key}" if path else key
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            regressions += compare(actual, expected, tolerance, where)
+        elif not isinstance(expected, (int, float)) or not isinstance(actual, (int, float)) or not expected:
+            continue
+        elif key in HIGHER_IS_BETTER and actual < expected * (1 - tolerance):
+            regressions.append(f"{where}: {actual} vs baseline {expected} (dropped)")
+        elif key in LOWER_IS_BETTER and actual > expected * (1 + tolerance):
+            regressions.append(f"{where}: {actual} vs baseline {expected} (rose)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", dest="scales", action="append", choices=list(SCALES), help="Repeatable")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows in the dimension tables and inventory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", action="store_true", help="Also load, serve and extract (drops the retail tables)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route class")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--work-dir", help="Where datasets are generated (default: system temp dir)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    results = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "scales": {name: run_scale(args, SCALES[name]) for name in args.scales or ["10k"]},
+    }
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Only scales present in both runs are compared; the machine block is informational
+        regressions = compare(results["scales"], baseline.get("scales", {}), args.tolerance)
+    results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""Assets and task settings shared by the retail ETL DAG and the DAGs consuming its tables.
+
+Not a DAG itself (listed in .airflowignore); the DAG files import it from the DAGs folder.
+"""
+import os
+from datetime import timedelta
+
+from airflow.sdk import Asset, AssetAlias
+
+from data.schema import TABLES
+
+ETL_POOL = os.getenv("RETAIL_ETL_POOL", "default_pool")
+MAX_PARALLEL_TABLES = int(os.getenv("RETAIL_ETL_MAX_PARALLEL", "4"))
+
+# Shared by every per-table task. none_failed: a table skipped for having no new rows must
+# not skip the tables after it
+TABLE_TASK_ARGS = {
+    "pool": ETL_POOL,
+    "max_active_tis_per_dagrun": MAX_PARALLEL_TABLES,
+    "retries": 2,
+    "retry_delay": timedelta(minutes=1),
+    "trigger_rule": "none_failed",
+}
+
+# One asset per public.* table. Mapped load tasks only know their table at run time, so
+# they publish through the alias; consumers schedule on the table assets themselves
+TABLE_ASSETS = {table: Asset(f"retail.public.{table}") for table in TABLES}
+LOADED_TABLES = AssetAlias("retail.public.loads")
+
+
+def changed_tables(triggering_asset_events):
+    """{table: metadata of its latest event} for the table assets that triggered this run"""
+    tables_by_name = {asset.name: table for table, asset in TABLE_ASSETS.items()}
+    changed = {}
+    for asset, events in (triggering_asset_events or {}).items():
+        table = tables_by_name.get(getattr(asset, "name", None))
+        if table and events:
+            changed[table] = dict(events[-1].extra)
+    return changed
@@ -0,0 +1,106 @@
+"""DAGs that consume the retail tables, scheduled on the assets retail_etl publishes.
+
+They run only when a table they read actually received rows, and only work on
+those tables:
+
+    retail_analytics_refresh  transactions/products/stores changed: ANALYZE them and
+                              re-warm the API's cached analytics
+    retail_api_extract        any table changed: extract the changed endpoints into apis.*
+    retail_exports            any table changed: re-export the changed tables as CSV
+"""
+import functools
+import logging
+import operator
+from datetime import datetime
+
+from airflow import DAG
+from airflow.sdk import task
+
+from retail_common import TABLE_ASSETS, TABLE_TASK_ARGS, changed_tables
+
+log = logging.getLogger(__name__)
+
+ANY_TABLE = functools.reduce(operator.or_, TABLE_ASSETS.values())
+# Tables behind the cached analytics endpoints and their rollups
+ANALYTICS_TABLES = ["transactions", "products", "stores"]
+
+
+@task
+def tables_to_refresh(triggering_asset_events=None) -> list:
+    changed = changed_tables(triggering_asset_events)
+    for table, metadata in sorted(changed.items()):
+        log.info("%s: %s new rows, watermark %s", table, metadata.get("rows"), metadata.get("watermark"))
+    # An empty list maps to zero task instances, so a run with nothing changed does no work
+    return sorted(changed)
+
+
+@task
+def analyze_changed(tables: list) -> list:
+    from airflow.exceptions import AirflowSkipException
+
+    from data.ingest_data import analyze_tables
+
+    if not tables:
+        raise AirflowSkipException("No analytics table changed")
+    analyze_tables(tables)
+    return tables
+
+
+@task
+def warm_cache() -> int:
+    import requests
+
+    from APIs.data_ingestion import warm_api_cache
+
+    try:
+        return warm_api_cache()
+    except requests.RequestException as e:
+        # The API may be down for deploys; a cold cache only costs the first request
+        log.warning("Skipping API cache warm-up: %s", e)
+        return 0
+
+
+@task(**TABLE_TASK_ARGS)
+def extract_endpoint(endpoint: str) -> int:
+    from APIs.data_ingestion import load_endpoint
+
+    return load_endpoint(endpoint)
+
+
+@task(**TABLE_TASK_ARGS)
+def export_changed_table(table: str) -> str:
+    from APIs.data_ingestion import export_table
+
+    return export_table(table, fmt="csv")
+
+
+with DAG(
+    dag_id="retail_analytics_refresh",
+    start_date=datetime(2024, 1, 1),
+    schedule=functools.reduce(operator.or_, (TABLE_ASSETS[table] for table in ANALYTICS_TABLES)),
+    catchup=False,
+    tags=["retail", "analytics"],
+):
+    analyze_changed(tables_to_refresh()) >> warm_cache()
+
+
+with DAG(
+    dag_id="retail_api_extract",
+    start_date=datetime(2024, 1, 1),
+    schedule=ANY_TABLE,
+    catchup=False,
+    max_active_runs=1,
+    tags=["retail", "etl"],
+):
+    extract_endpoint.expand(endpoint=tables_to_refresh())
+
+
+with DAG(
+    dag_id="retail_exports",
+    start_date=datetime(2024, 1, 1),
+    schedule=ANY_TABLE,
+    catchup=False,
+    max_active_runs=1,
+    tags=["retail", "exports"],
+):
+    export_changed_table.expand(table=tables_to_refresh())
@@ -0,0 +1,28 @@
+class IterStream:
+    """File-like object over an iterator of text chunks, for COPY ... FROM STDIN.
+
+    The next chunk is only pulled once COPY has consumed the buffered one, so at
+    most one chunk is held in memory at a time. Subclasses producing bytes
+    instead of text set `empty = b""`. `bytes_read` counts what COPY consumed
+    (characters for text streams).
+    """
+
+    empty = ""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self._buffer = self.empty
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, self.empty
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.bytes_read += len(data)
+        return data
@@ -1,9 +1,13 @@
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import random
 from faker import Faker
-from datetime import timedelta
 
-fake = Faker()
+from data.parquet_source import PARTITION_COLUMNS
 
 # Configuration
 ROWS = 150
@@ -14,134 +18,411 @@ LOYALTY_TIERS = ["Silver", "Gold", "Platinum"]
 STORE_TYPES = ["Mall", "Standalone", "Online"]
 RETURN_REASONS = ["Damaged", "Wrong Item", "No Longer Needed"]
 DISCOUNT_PERCENTAGES = [5, 10, 15, 20, 30]
+RETURN_RATE = 0.3  # Only 30% of transactions result in returns
+FAKER_POOL_SIZE = 2000  # distinct Faker values generated once per kind, then sampled
+CHUNK_ROWS = 1_000_000
+# Transactions drawn from one child seed: fixed, so --chunk-rows only groups blocks for writing
+BLOCK_ROWS = 100_000
+SHARDS = 8  # fixed default so a seed reproduces the same files on any machine
+SEEDED_END_DATE = "2024-12-31"  # fixed default with --seed, so the output doesn't change from day to day
+TRANSACTION_COLUMNS = [
+    "transaction_id", "customer_id", "product_id", "store_id", "quantity", "transaction_date", "total_amount"
+]
+RETURN_COLUMNS = ["return_id", "transaction_id", "reason", "refund_amount"]
+
+
+def make_faker_pools(seed, size=FAKER_POOL_SIZE):
+    # Faker is slow per call, so build each pool once and sample from it with NumPy
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        "word": np.array([fake.word().capitalize() for _ in range(size)], dtype=object),
+        "name": np.array([fake.name() for _ in range(size)], dtype=object),
+        "email": np.array([fake.email() for _ in range(size)], dtype=object),
+        "city": np.array([fake.city() for _ in range(size)], dtype=object),
+        "company": np.array([fake.company() for _ in range(size)], dtype=object),
+        "country": np.array([fake.country() for _ in range(size)], dtype=object),
+        "catch_phrase": np.array([fake.catch_phrase() for _ in range(size)], dtype=object),
+    }
+
+
+def sample(rng, values, n):
+    values = np.asarray(values, dtype=object)
+    return values[rng.integers(0, len(values), n)]
+
+
+def random_dates(rng, end_date, max_days_back, n):
+    return np.datetime64(end_date, "D") - rng.integers(0, max_days_back + 1, n).astype("timedelta64[D]")
+
 
 # ---------------- PRODUCTS ----------------
-costs = [round(random.uniform(MIN_COST, MAX_COST), 2) for _ in range(ROWS)]
-products = pd.DataFrame({
-    "product_id": range(1, ROWS + 1),
-    "sku": [f"SKU{random.randint(100000, 999999)}" for _ in range(ROWS)],
-    "product_name": [fake.word().capitalize() for _ in range(ROWS)],
-    "category": [random.choice(CATEGORIES) for _ in range(ROWS)],
-    "cost": costs,
-    "price": [round(c * random.uniform(MIN_MARKUP, MAX_MARKUP), 2) for c in costs]
-})
-
-# Ensure SKUs are unique
-seen_skus = set()
-unique_skus = []
-for sku in products['sku']:
-    while sku in seen_skus:
-        sku = f"SKU{random.randint(100000, 999999)}"
-    seen_skus.add(sku)
-    unique_skus.append(sku)
-products['sku'] = unique_skus
+def generate_products(rng, pools, n):
+    costs = np.round(rng.uniform(MIN_COST, MAX_COST, n), 2)
+
+    # Unique SKUs without a retry loop: sample distinct numbers, widening past 6 digits if needed
+    digits = max(6, len(str(n * 10)))
+    low = 10 ** (digits - 1)
+    sku_numbers = low + rng.choice(9 * low, size=n, replace=False)
+
+    return pd.DataFrame({
+        "product_id": np.arange(1, n + 1),
+        "sku": "SKU" + pd.Series(sku_numbers).astype(str),
+        "product_name": sample(rng, pools["word"], n),
+        "category": sample(rng, CATEGORIES, n),
+        "cost": costs,
+        "price": np.round(costs * rng.uniform(MIN_MARKUP, MAX_MARKUP, n), 2),
+    })
+
+
 # ---------------- CUSTOMERS ----------------
-customers = pd.DataFrame({
-    "customer_id": range(1, ROWS + 1),
-    "name": [fake.name() for _ in range(ROWS)],
-    "email": [fake.email() for _ in range(ROWS)],
-    "city": [fake.city() for _ in range(ROWS)],
-    "loyalty_tier": [random.choice(LOYALTY_TIERS) for _ in range(ROWS)]
-})
+def generate_customers(rng, pools, n):
+    return pd.DataFrame({
+        "customer_id": np.arange(1, n + 1),
+        "name": sample(rng, pools["name"], n),
+        "email": sample(rng, pools["email"], n),
+        "city": sample(rng, pools["city"], n),
+        "loyalty_tier": sample(rng, LOYALTY_TIERS, n),
+    })
+
 
 # ---------------- STORES ----------------
-stores = pd.DataFrame({
-    "store_id": range(1, ROWS + 1),
-    "store_name": [fake.company() for _ in range(ROWS)],
-    "city": [fake.city() for _ in range(ROWS)],
-    "store_type": [random.choice(STORE_TYPES) for _ in range(ROWS)]
-})
+def generate_stores(rng, pools, n):
+    return pd.DataFrame({
+        "store_id": np.arange(1, n + 1),
+        "store_name": sample(rng, pools["company"], n),
+        "city": sample(rng, pools["city"], n),
+        "store_type": sample(rng, STORE_TYPES, n),
+    })
+
 
 # ---------------- SUPPLIERS ----------------
-suppliers = pd.DataFrame({
-    "supplier_id": range(1, ROWS + 1),
-    "supplier_name": [fake.company() for _ in range(ROWS)],
-    "country": [fake.country() for _ in range(ROWS)],
-    "lead_time_days": [random.randint(3, 30) for _ in range(ROWS)]
-})
+def generate_suppliers(rng, pools, n):
+    return pd.DataFrame({
+        "supplier_id": np.arange(1, n + 1),
+        "supplier_name": sample(rng, pools["company"], n),
+        "country": sample(rng, pools["country"], n),
+        "lead_time_days": rng.integers(3, 31, n),
+    })
+
 
 # ---------------- INVENTORY ----------------
-# Allow realistic inventory where multiple stores can stock the same product
-inventory = pd.DataFrame({
-    "inventory_id": range(1, ROWS + 1),
-    "product_id": random.choices(products.product_id.tolist(), k=ROWS),
-    "store_id": random.choices(stores.store_id.tolist(), k=ROWS),
-    "stock_on_hand": [random.randint(0, 500) for _ in range(ROWS)],
-    "reorder_level": [random.randint(20, 100) for _ in range(ROWS)]
-})
-
-# Ensure reorder level doesn't exceed realistic bounds
-inventory['reorder_level'] = inventory.apply(
-    lambda row: min(row['reorder_level'], row['stock_on_hand'] + 50) if row['stock_on_hand'] > 0 else row['reorder_level'],
-    axis=1
-)
-
-# ---------------- TRANSACTIONS ----------------
-transactions = pd.DataFrame({
-    "transaction_id": range(1, ROWS + 1),
-    "customer_id": random.choices(customers.customer_id.tolist(), k=ROWS),
-    "product_id": random.choices(products.product_id.tolist(), k=ROWS),
-    "store_id": random.choices(stores.store_id.tolist(), k=ROWS),
-    "quantity": [random.randint(1, 5) for _ in range(ROWS)],
-    "transaction_date": [fake.date_between(start_date="-1y", end_date="today") for _ in range(ROWS)]
-})
-
-# Calculate total_amount based on actual product price × quantity
-transactions = transactions.merge(products[['product_id', 'price']], on='product_id')
-transactions['total_amount'] = round(transactions['quantity'] * transactions['price'], 2)
-transactions = transactions.drop('price', axis=1)
-
-# ---------------- RETURNS ----------------
-# Only create returns for actual transactions, and ensure refund doesn't exceed transaction amount
-num_returns = int(ROWS * 0.3)  # Only 30% of transactions result in returns
-return_transaction_ids = random.sample(transactions.transaction_id.tolist(), num_returns)
-
-returns_list = []
-for i, trans_id in enumerate(return_transaction_ids, 1):
-    trans_amount = transactions[transactions.transaction_id == trans_id]['total_amount'].values[0]
-    refund = round(random.uniform(min(5, trans_amount * 0.5), trans_amount), 2)
-    
-    returns_list.append({
-        "return_id": i,
-        "transaction_id": trans_id,
-        "reason": random.choice(RETURN_REASONS),
-        "refund_amount": refund
+def generate_inventory(rng, n, n_products, n_stores):
+    # Allow realistic inventory where multiple stores can stock the same product
+    stock_on_hand = rng.integers(0, 501, n)
+    reorder_level = rng.integers(20, 101, n)
+    # Ensure reorder level doesn't exceed realistic bounds
+    reorder_level = np.where(stock_on_hand > 0, np.minimum(reorder_level, stock_on_hand + 50), reorder_level)
+
+    return pd.DataFrame({
+        "inventory_id": np.arange(1, n + 1),
+        "product_id": rng.integers(1, n_products + 1, n),
+        "store_id": rng.integers(1, n_stores + 1, n),
+        "stock_on_hand": stock_on_hand,
+        "reorder_level": reorder_level,
+    })
+
+
+# ---------------- TRANSACTIONS + RETURNS ----------------
+def generate_transactions(rng, first_id, n, prices, n_customers, n_stores, end_date):
+    product_ids = rng.integers(1, len(prices) + 1, n)
+    quantity = rng.integers(1, 6, n)
+    return pd.DataFrame({
+        "transaction_id": np.arange(first_id, first_id + n),
+        "customer_id": rng.integers(1, n_customers + 1, n),
+        "product_id": product_ids,
+        "store_id": rng.integers(1, n_stores + 1, n),
+        "quantity": quantity,
+        "transaction_date": random_dates(rng, end_date, 365, n),
+        # total_amount is the actual product price × quantity
+        "total_amount": np.round(quantity * prices[product_ids - 1], 2),
+    })
+
+
+def generate_returns(rng, first_id, transactions, rate=RETURN_RATE):
+    # Only create returns for actual transactions, and ensure refund doesn't exceed transaction amount
+    picked = rng.choice(len(transactions), size=int(len(transactions) * rate), replace=False)
+    amounts = transactions["total_amount"].to_numpy()[picked]
+    low = np.minimum(5, amounts * 0.5)
+    return pd.DataFrame({
+        "return_id": np.arange(first_id, first_id + len(picked)),
+        "transaction_id": transactions["transaction_id"].to_numpy()[picked],
+        "reason": sample(rng, RETURN_REASONS, len(picked)),
+        "refund_amount": np.round(rng.uniform(low, amounts), 2),
     })
 
-returns = pd.DataFrame(returns_list)
 
 # ---------------- PROMOTIONS ----------------
-promotions = pd.DataFrame({
-    "promotion_id": range(1, ROWS + 1),
-    "promo_name": [fake.catch_phrase() for _ in range(ROWS)],
-    "discount_pct": [random.choice(DISCOUNT_PERCENTAGES) for _ in range(ROWS)],
-    "start_date": [fake.date_between("-6m", "today") for _ in range(ROWS)],
-})
-
-# Ensure end_date is after start_date
-promotions['end_date'] = promotions['start_date'].apply(
-    lambda x: x + timedelta(days=random.randint(7, 90))
-)
-
-# ---------------- SAVE ----------------
-import os
-os.makedirs("./data", exist_ok=True)
-
-products.to_csv("./data/products.csv", index=False)
-customers.to_csv("./data/customers.csv", index=False)
-stores.to_csv("./data/stores.csv", index=False)
-suppliers.to_csv("./data/suppliers.csv", index=False)
-inventory.to_csv("./data/inventory.csv", index=False)
-transactions.to_csv("./data/transactions.csv", index=False)
-returns.to_csv("./data/returns.csv", index=False)
-promotions.to_csv("./data/promotions.csv", index=False)
-
-print("✓ Dataset generated successfully!")
-print(f"  - {len(products)} products")
-print(f"  - {len(customers)} customers")
-print(f"  - {len(stores)} stores")
-print(f"  - {len(suppliers)} suppliers")
-print(f"  - {len(inventory)} inventory records")
-print(f"  - {len(transactions)} transactions")
-print(f"  - {len(returns)} returns")
-print(f"  - {len(promotions)} promotions")
\ No newline at end of file
+def generate_promotions(rng, pools, n, end_date):
+    start_dates = random_dates(rng, end_date, 182, n)
+    return pd.DataFrame({
+        "promotion_id": np.arange(1, n + 1),
+        "promo_name": sample(rng, pools["catch_phrase"], n),
+        "discount_pct": sample(rng, DISCOUNT_PERCENTAGES, n).astype(int),
+        "start_date": start_dates,
+        # Ensure end_date is after start_date
+        "end_date": start_dates + rng.integers(7, 91, n).astype("timedelta64[D]"),
+    })
+
+
+def shard_sizes(total, shards):
+    base, extra = divmod(total, shards)
+    return [base + (shard < extra) for shard in range(shards)]
+
+
+def returns_in_shard(n, rate):
+    # Same count generate_returns produces block by block, so return ids can be assigned upfront
+    full_blocks, rest = divmod(n, BLOCK_ROWS)
+    return full_blocks * int(BLOCK_ROWS * rate) + int(rest * rate)
+
+
+def plan_shards(args):
+    """(first transaction id, transactions, first return id) per shard, as disjoint id ranges"""
+    plan = []
+    first_id = first_return_id = 1
+    for n in shard_sizes(args.transactions, args.shards):
+        plan.append((first_id, n, first_return_id))
+        first_id += n
+        first_return_id += returns_in_shard(n, args.return_rate)
+    return plan
+
+
+def block_seed(seed_seq, block):
+    # The block-th child of the shard's seed, derived directly so it doesn't depend on earlier spawns
+    return np.random.SeedSequence(seed_seq.entropy, spawn_key=seed_seq.spawn_key + (block,))
+
+
+def part_path(parts_dir, name, shard):
+    return os.path.join(parts_dir, f"{name}-{shard:04d}.csv")
+
+
+def to_arrow(df):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Generated dates are whole days: store them as DATE rather than timestamps
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            table = table.set_column(i, field.name, table[field.name].cast(pa.date32()))
+    return table
+
+
+class CsvPartWriter:
+    """Appends header-less CSV chunks to a shard's part files"""
+
+    def __init__(self, parts_dir, shard):
+        self.transactions = open(part_path(parts_dir, "transactions", shard), "w", newline="")
+        self.returns = open(part_path(parts_dir, "returns", shard), "w", newline="")
+
+    def write(self, transactions, returns):
+        transactions.to_csv(self.transactions, header=False, index=False)
+        returns.to_csv(self.returns, header=False, index=False)
+
+    def close(self):
+        self.transactions.close()
+        self.returns.close()
+
+
+class ParquetPartWriter:
+    """Writes a shard's chunks into the hive-partitioned transactions dataset and a returns file.
+
+    One file per (partition, shard) stays open, and every chunk adds a row group to it.
+    """
+
+    def __init__(self, output_dir, shard):
+        self.transactions_dir = os.path.join(output_dir, "transactions.parquet")
+        self.returns_path = os.path.join(output_dir, "returns.parquet", f"part-{shard:04d}.parquet")
+        self.partition_column = PARTITION_COLUMNS["transactions"]
+        self.shard = shard
+        self.writers = {}
+        self.returns_writer = None
+
+    def _writer(self, path, schema):
+        import pyarrow.parquet as pq
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return pq.ParquetWriter(path, schema)
+
+    def write(self, transactions, returns):
+        # Sort the chunk by partition value so each partition is one contiguous slice
+        dates = transactions[self.partition_column].to_numpy()
+        order = np.argsort(dates, kind="stable")
+        sorted_dates = dates[order]
+        table = to_arrow(transactions.drop(columns=self.partition_column).iloc[order])
+        values, starts = np.unique(sorted_dates, return_index=True)
+        ends = list(starts[1:]) + [len(sorted_dates)]
+        for value, start, end in zip(values, starts, ends):
+            key = str(np.datetime64(value, "D"))
+            if key not in self.writers:
+                path = os.path.join(
+                    self.transactions_dir, f"{self.partition_column}={key}", f"part-{self.shard:04d}.parquet"
+                )
+                self.writers[key] = self._writer(path, table.schema)
+            self.writers[key].write_table(table.slice(start, end - start))
+
+        returns_table = to_arrow(returns)
+        if self.returns_writer is None:
+            self.returns_writer = self._writer(self.returns_path, returns_table.schema)
+        self.returns_writer.write_table(returns_table)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        if self.returns_writer is not None:
+            self.returns_writer.close()
+
+
+def generate_block(seed_seq, block, first_id, n, first_return_id, prices, args):
+    """Transactions and returns of one BLOCK_ROWS block of a shard, drawn from the block's own seed"""
+    rng = np.random.default_rng(block_seed(seed_seq, block))
+    transactions = generate_transactions(rng, first_id, n, prices, args.customers, args.stores, args.end_date)
+    # Returns only reference transactions from the same block, so every transaction_id exists
+    return transactions, generate_returns(rng, first_return_id, transactions, args.return_rate)
+
+
+def generate_shard(shard, seed_seq, first_id, n, first_return_id, prices, args, parts_dir):
+    """Generate one shard's transactions and returns in chunks, appending them to its part files.
+
+    Rows are drawn a block at a time and a chunk is a run of whole blocks, so the data
+    depends on the seed and shard plan but not on --chunk-rows.
+    """
+    blocks_per_chunk = max(1, args.chunk_rows // BLOCK_ROWS)
+    n_returns = 0
+    writer = ParquetPartWriter(args.output_dir, shard) if args.format == "parquet" else CsvPartWriter(parts_dir, shard)
+    try:
+        n_blocks = -(-n // BLOCK_ROWS)
+        for chunk_start in range(0, n_blocks, blocks_per_chunk):
+            transactions, returns = [], []
+            for block in range(chunk_start, min(chunk_start + blocks_per_chunk, n_blocks)):
+                block_first_id = first_id + block * BLOCK_ROWS
+                block_n = min(BLOCK_ROWS, first_id + n - block_first_id)
+                block_transactions, block_returns = generate_block(
+                    seed_seq, block, block_first_id, block_n, first_return_id + n_returns, prices, args
+                )
+                transactions.append(block_transactions)
+                returns.append(block_returns)
+                n_returns += len(block_returns)
+            writer.write(pd.concat(transactions, ignore_index=True), pd.concat(returns, ignore_index=True))
+    finally:
+        writer.close()
+    return n, n_returns
+
+
+def merge_parts(parts_dir, name, columns, shards, output_dir):
+    # Parts are plain CSV rows in id order, so concatenating them byte-wise is the whole merge
+    with open(os.path.join(output_dir, f"{name}.csv"), "wb") as out:
+        out.write((",".join(columns) + "\n").encode())
+        for shard in range(shards):
+            with open(part_path(parts_dir, name, shard), "rb") as part:
+                shutil.copyfileobj(part, out, 1024 * 1024)
+
+
+def write_transactions_and_returns(shard_seeds, args, prices):
+    """Generate transactions and returns across a process pool, one part file per shard"""
+    parts_dir = os.path.join(args.output_dir, "_parts")
+    if args.format == "parquet":
+        # Shards add files to the datasets, so clear out any previous run first
+        for name in ["transactions", "returns"]:
+            shutil.rmtree(os.path.join(args.output_dir, f"{name}.parquet"), ignore_errors=True)
+    else:
+        os.makedirs(parts_dir, exist_ok=True)
+    plan = plan_shards(args)
+
+    jobs = [
+        (shard, shard_seeds[shard], first_id, n, first_return_id, prices, args, parts_dir)
+        for shard, (first_id, n, first_return_id) in enumerate(plan)
+    ]
+    if args.workers > 1 and args.shards > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, args.shards)) as executor:
+            counts = list(executor.map(generate_shard, *zip(*jobs)))
+    else:
+        counts = [generate_shard(*job) for job in jobs]
+
+    if args.format == "csv":
+        merge_parts(parts_dir, "transactions", TRANSACTION_COLUMNS, args.shards, args.output_dir)
+        merge_parts(parts_dir, "returns", RETURN_COLUMNS, args.shards, args.output_dir)
+        shutil.rmtree(parts_dir)
+    return sum(n for n, _ in counts), sum(n for _, n in counts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the synthetic retail dataset")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Default row count for every table")
+    for table in ["products", "customers", "stores", "suppliers", "inventory", "transactions", "promotions"]:
+        parser.add_argument(f"--{table}", type=int, help=f"Rows in {table} (default: --rows)")
+    parser.add_argument("--return-rate", type=float, default=RETURN_RATE, help="Share of transactions returned")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument(
+        "--end-date", help=f"Latest generated date (YYYY-MM-DD; default: {SEEDED_END_DATE} with --seed, else today)"
+    )
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"Transactions written per chunk (whole {BLOCK_ROWS}-row blocks; doesn't change the data)")
+    parser.add_argument("--shards", type=int, default=SHARDS, help="Transaction shards, each with its own sub-seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes generating shards")
+    parser.add_argument("--faker-pool-size", type=int, default=FAKER_POOL_SIZE, help="Distinct Faker values per kind")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output file format")
+    parser.add_argument("--output-dir", default="./data")
+    args = parser.parse_args(argv)
+    for table in ["products", "customers", "stores", "suppliers", "inventory", "transactions", "promotions"]:
+        if getattr(args, table) is None:
+            setattr(args, table, args.rows)
+    if args.end_date is None:
+        args.end_date = SEEDED_END_DATE if args.seed is not None else str(np.datetime64("today", "D"))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Dimension tables use the first child seed and shard k the (k + 1)th, so dimensions don't
+    # depend on the shard count and each shard's stream doesn't depend on scheduling
+    dimension_seed, *shard_seeds = np.random.SeedSequence(args.seed).spawn(args.shards + 1)
+    rng = np.random.default_rng(dimension_seed)
+    pools = make_faker_pools(args.seed, args.faker_pool_size)
+
+    products = generate_products(rng, pools, args.products)
+    customers = generate_customers(rng, pools, args.customers)
+    stores = generate_stores(rng, pools, args.stores)
+    suppliers = generate_suppliers(rng, pools, args.suppliers)
+    inventory = generate_inventory(rng, args.inventory, args.products, args.stores)
+    promotions = generate_promotions(rng, pools, args.promotions, args.end_date)
+
+    # ---------------- SAVE ----------------
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, df in [
+        ("products", products),
+        ("customers", customers),
+        ("stores", stores),
+        ("suppliers", suppliers),
+        ("inventory", inventory),
+        ("promotions", promotions),
+    ]:
+        if args.format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(to_arrow(df), os.path.join(args.output_dir, f"{name}.parquet"))
+        else:
+            df.to_csv(os.path.join(args.output_dir, f"{name}.csv"), index=False)
+
+    n_transactions, n_returns = write_transactions_and_returns(shard_seeds, args, products["price"].to_numpy())
+
+    print("✓ Dataset generated successfully!")
+    print(f"  - {len(products)} products")
+    print(f"  - {len(customers)} customers")
+    print(f"  - {len(stores)} stores")
+    print(f"  - {len(suppliers)} suppliers")
+    print(f"  - {len(inventory)} inventory records")
+    print(f"  - {n_transactions} transactions")
+    print(f"  - {n_returns} returns")
+    print(f"  - {len(promotions)} promotions")
+    return {
+        "products": len(products),
+        "customers": len(customers),
+        "stores": len(stores),
+        "suppliers": len(suppliers),
+        "inventory": len(inventory),
+        "transactions": n_transactions,
+        "returns": n_returns,
+        "promotions": len(promotions),
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,445 @@
-import psycopg2
-import pandas as pd
-import io
-import datetime
+import argparse
+import hashlib
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import os
 
+from data.copy_stream import IterStream
+from data.load_metrics import table_load, timed
+from data.parquet_source import ROLLUP_COLUMNS, ArrowCopyStream, column_bounds, parquet_path, record_batches
+from data.partitions import ensure_month_partitions, ensure_partitions_for
+from data.rollups import ROLLUP_TABLES, RollupDelta, apply_staged_transactions, create_rollup_tables
+from data.schema import (
+    TABLES, create_table_sql, index_statements, load_order, merge_sql, primary_key_columns, read_csv_options
+)
+from data.versions import bump_versions, create_versions_table
+
 load_dotenv()
 
+# pandas, psycopg2 and the encoders are imported where they are used, so importing this
+# module (Airflow parses DAGs that reference it) stays cheap
+
 host = os.getenv("DB_HOST")
 port = os.getenv("DB_PORT")
 database = os.getenv("DB_NAME")
 user = os.getenv("DB_USER")
 password = os.getenv("DB_PASSWORD")
 
+def connect():
+    import psycopg2
 
-conn = psycopg2.connect(
-    host=host,
-    port=port,
-    database=database,
-    user=user,
-    password=password
-)
+    return psycopg2.connect(
+        host=host,
+        port=port,
+        database=database,
+        user=user,
+        password=password
+    )
 
-def read_data_from_csv(file_path):
-    return pd.read_csv(file_path)
+STATE_TABLE = "public.ingest_state"
+CHECKSUM_WINDOW = 64 * 1024  # bytes hashed just before the stored offset
 
-def create_table_if_not_exists(table_name, df):
-    columns = []
-    for col, dtype in df.dtypes.items():
-        if "int" in str(dtype):
-            sql_type = "BIGINT"
-        elif "float" in str(dtype):
-            sql_type = "DOUBLE PRECISION"
-        else:
-            sql_type = "TEXT"
-        columns.append(f"{col} {sql_type}")
-    
-    columns.append("load_date TIMESTAMP")
-    
-    create_query = f"""
-        CREATE TABLE IF NOT EXISTS public.{table_name} (
-            {', '.join(columns)}
-        );
-    """
+CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "250000"))
+LOAD_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+DATA_DIR = os.getenv("INGEST_DATA_DIR", "./data")
+INPUT_FORMAT = os.getenv("INGEST_FORMAT", "csv")  # csv or parquet
+COPY_FORMAT = os.getenv("INGEST_COPY_FORMAT", "csv")  # csv or binary
+
+# Tables whose rows must pass through pandas on a full load (rollup maintenance)
+TRANSFORMED_TABLES = {"transactions"}
+
+def read_csv_chunks(table_name, file_path, chunk_rows=CHUNK_ROWS):
+    import pandas as pd
+
+    return pd.read_csv(file_path, chunksize=chunk_rows, **read_csv_options(table_name))
+
+def read_csv_header(file_path):
+    import pandas as pd
+
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+def partition_bounds(table_name, file_path, input_format=INPUT_FORMAT, chunk_rows=CHUNK_ROWS):
+    """First and last date of the table's partition column in the input, reading only that column"""
+    import pandas as pd
+
+    key = TABLES[table_name].partition_key
+    if input_format == "parquet":
+        return column_bounds(table_name, file_path, key)
+    start = end = None
+    for chunk in pd.read_csv(file_path, usecols=[key], parse_dates=[key], chunksize=chunk_rows):
+        if chunk.empty:
+            continue
+        low, high = chunk[key].min().date(), chunk[key].max().date()
+        start = low if start is None else min(start, low)
+        end = high if end is None else max(end, high)
+    return start, end
+
+def create_table_if_not_exists(conn, table_name):
+    # load_date always comes from this default, never from the loader: every path stamps rows with
+    # the server's clock, so max(load_date) only moves forward across loads
+    create_query = create_table_sql(
+        "public", table_name, extra_columns=[("load_date", "TIMESTAMP DEFAULT now()")]
+    )
     curr = conn.cursor()
     curr.execute(create_query)
+    # Tables created before the default get it once: the ALTER takes an ACCESS EXCLUSIVE lock on the
+    # table and every partition, which would queue each load behind the API's readers and vice versa
+    curr.execute("""
+        SELECT column_default FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = %s AND column_name = 'load_date'
+    """, (table_name,))
+    row = curr.fetchone()
+    if row and row[0] is None:
+        curr.execute(f"ALTER TABLE public.{table_name} ALTER COLUMN load_date SET DEFAULT now()")
     conn.commit()
     curr.close()
 
-def ingest_csv_to_db(table_name, df):
-    load_date = datetime.datetime.now()
-    df['load_date'] = load_date
-    
-    buffer = io.StringIO()
-    # Convert DataFrame → CSV (in memory)
-    df.to_csv(buffer, index=False, header=False)  # Changed header=False
-    buffer.seek(0)
-    
+def ensure_indexes(curr, table_name):
+    for statement in index_statements("public", table_name):
+        curr.execute(statement)
+
+class ChunkCopyStream(IterStream):
+    """Encodes DataFrame chunks as CSV for COPY"""
+
+    copy_options = "CSV"
+
+    def __init__(self, chunks, key, on_chunk=None):
+        self.key = key
+        self.on_chunk = on_chunk
+        self.rows = 0
+        self.watermark = None
+        super().__init__(self._encode(chunk) for chunk in chunks)
+
+    def _encode(self, chunk):
+        self.rows += len(chunk)
+        if not chunk.empty:
+            chunk_max = int(chunk[self.key].max())
+            self.watermark = chunk_max if self.watermark is None else max(self.watermark, chunk_max)
+        if self.on_chunk:
+            self.on_chunk(chunk)
+        return self._format(chunk)
+
+    def _format(self, chunk):
+        return chunk.to_csv(index=False, header=False)
+
+class BinaryChunkCopyStream(ChunkCopyStream):
+    """ChunkCopyStream sending COPY's binary format, so the server parses no text"""
+
+    empty = b""
+    copy_options = "(FORMAT binary)"
+
+    def __init__(self, chunks, key, on_chunk=None, pg_types=None):
+        from data.pgbinary import HEADER, TRAILER
+
+        self.pg_types = dict(pg_types or {})
+        super().__init__(chunks, key, on_chunk)
+        self.chunks = itertools.chain([HEADER], self.chunks, [TRAILER])
+
+    def _format(self, chunk):
+        from data.pgbinary import encode_frame
+
+        return encode_frame(chunk, [self.pg_types[col] for col in chunk.columns])
+
+def copy_raw_file(curr, table_name, file_path, columns, stats=None):
+    # No transform needed: hand the file bytes straight to COPY, load_date comes from the column default
+    with open(file_path, "rb") as f, timed(stats, "copy"):
+        curr.copy_expert(f"""
+            COPY public.{table_name} ({', '.join(columns)})
+            FROM STDIN
+            WITH (FORMAT csv, HEADER true)
+        """, f, size=1024 * 1024)
+        if stats is not None:
+            stats.bytes = f.tell()
+    rows = curr.rowcount
+    curr.execute(f"SELECT max({TABLES[table_name].primary_key}) FROM public.{table_name}")
+    return rows, curr.fetchone()[0]
+
+def column_types(table_name):
+    return {col.name: col.pg_type for col in TABLES[table_name].columns}
+
+def chunk_stream(table_name, chunks, rollup=None, copy_format=COPY_FORMAT):
+    key = TABLES[table_name].primary_key
+    on_chunk = rollup.add if rollup else None
+    if copy_format == "binary":
+        return BinaryChunkCopyStream(chunks, key, on_chunk, column_types(table_name))
+    return ChunkCopyStream(chunks, key, on_chunk)
+
+def parquet_stream(table_name, file_path, columns, chunk_rows=CHUNK_ROWS, watermark=None, rollup=None,
+                   copy_format=COPY_FORMAT):
+    tables = record_batches(table_name, file_path, columns, chunk_rows, watermark)
+    if copy_format == "binary":
+        # The binary encoder works from NumPy buffers, which to_pandas hands over without copying
+        frames = (table.to_pandas(date_as_object=False) for table in tables)
+        return chunk_stream(table_name, frames, rollup, copy_format)
+    on_chunk = None
+    if rollup:
+        # RollupDelta works on pandas; only the handful of columns it aggregates are converted
+        on_chunk = lambda table: rollup.add(table.select(ROLLUP_COLUMNS).to_pandas(date_as_object=False))
+    return ArrowCopyStream(tables, TABLES[table_name].primary_key, on_chunk)
+
+def copy_stream_to_db(curr, table_name, stream, columns, stats=None):
+    # load_date is left to the column default
+    with timed(stats, "copy"):
+        curr.copy_expert(f"""
+            COPY public.{table_name} ({', '.join(columns)})
+            FROM STDIN
+            WITH {stream.copy_options}
+        """, stream, size=1024 * 1024)
+    if stats is not None:
+        stats.bytes = stream.bytes_read
+    return stream.rows, stream.watermark
+
+def create_state_table(conn):
     curr = conn.cursor()
-    
-    # Get column names in the correct order
-    columns = list(df.columns)
-    
-    copy_query = f"""
-        COPY public.{table_name} ({', '.join(columns)})
-        FROM STDIN
-        WITH CSV
-    """
-    curr.copy_expert(copy_query, buffer)
+    curr.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            watermark BIGINT,
+            byte_offset BIGINT NOT NULL DEFAULT 0,
+            file_checksum TEXT,
+            updated_at TIMESTAMP
+        );
+    """)
     conn.commit()
     curr.close()
 
+def get_load_state(conn, table_name):
+    curr = conn.cursor()
+    curr.execute(
+        f"SELECT watermark, byte_offset, file_checksum FROM {STATE_TABLE} WHERE table_name = %s",
+        (table_name,)
+    )
+    row = curr.fetchone()
+    curr.close()
+    return row or (None, 0, None)
+
+def is_empty(conn, table_name):
+    curr = conn.cursor()
+    curr.execute(f"SELECT NOT EXISTS (SELECT 1 FROM public.{table_name})")
+    empty = curr.fetchone()[0]
+    curr.close()
+    return empty
+
+def save_load_state(curr, table_name, watermark, byte_offset, file_checksum):
+    curr.execute(f"""
+        INSERT INTO {STATE_TABLE} (table_name, watermark, byte_offset, file_checksum, updated_at)
+        VALUES (%s, %s, %s, %s, now())
+        ON CONFLICT (table_name) DO UPDATE SET
+            watermark = GREATEST({STATE_TABLE}.watermark, EXCLUDED.watermark),
+            byte_offset = EXCLUDED.byte_offset,
+            file_checksum = EXCLUDED.file_checksum,
+            updated_at = EXCLUDED.updated_at
+    """, (table_name, watermark, byte_offset, file_checksum))
+
+def file_checksum(file_path, offset):
+    # Hash a fixed window ending at the offset: cheap, and catches rewritten files
+    start = max(0, offset - CHECKSUM_WINDOW)
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+def resume_offset(file_path):
+    # Resume after the last complete line only; a partial trailing row is re-read next run
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return 0
+    with open(file_path, "rb") as f:
+        f.seek(size - 1)
+        return size if f.read(1) == b"\n" else 0
+
+def read_new_chunks(table_name, file_path, state, chunk_rows=CHUNK_ROWS):
+    import pandas as pd
+
+    key = TABLES[table_name].primary_key
+    watermark, byte_offset, checksum = state
+    size = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as f:
+        if byte_offset and size >= byte_offset and file_checksum(file_path, byte_offset) == checksum:
+            # The file only grew since the last run: parse the appended bytes only
+            if size == byte_offset:
+                return
+            columns = read_csv_header(file_path)
+            f.seek(byte_offset)
+            reader = pd.read_csv(
+                f, header=None, names=columns, chunksize=chunk_rows, **read_csv_options(table_name)
+            )
+        else:
+            reader = pd.read_csv(f, chunksize=chunk_rows, **read_csv_options(table_name))
+
+        for chunk in reader:
+            if watermark is not None:
+                chunk = chunk[chunk[key] > watermark]
+            if not chunk.empty:
+                yield chunk
+
+def upsert_stream_to_db(curr, table_name, stream, columns, stats=None):
+    # Stage the batch, then merge it on the primary key so re-runs never duplicate rows
+    curr.execute(f"""
+        CREATE TEMP TABLE stage_{table_name}
+        (LIKE public.{table_name} INCLUDING DEFAULTS)
+        ON COMMIT DROP
+    """)
+    with timed(stats, "copy"):
+        curr.copy_expert(f"""
+            COPY stage_{table_name} ({', '.join(columns)})
+            FROM STDIN
+            WITH {stream.copy_options}
+        """, stream, size=1024 * 1024)
+    with timed(stats, "merge"):
+        if TABLES[table_name].partition_key:
+            ensure_partitions_for(curr, "public", table_name, f"stage_{table_name}")
+    if table_name == "transactions":
+        # Before the merge, so rows the merge turns into updates aren't counted a second time
+        with timed(stats, "rollup"):
+            apply_staged_transactions(curr, "public", f"stage_{table_name}")
+    with timed(stats, "merge"):
+        # load_date comes from the staging table's default, so updated rows get the new stamp too
+        keys = primary_key_columns(curr, "public", table_name)
+        curr.execute(merge_sql("public", table_name, f"stage_{table_name}", list(columns) + ["load_date"], keys))
+    if stats is not None:
+        stats.bytes = stream.bytes_read
+    return stream.rows, stream.watermark
+
+def load_table(table, incremental=False, chunk_rows=CHUNK_ROWS, input_format=INPUT_FORMAT, data_dir=DATA_DIR,
+               copy_format=COPY_FORMAT):
+    parquet = input_format == "parquet"
+    file_path = parquet_path(data_dir, table) if parquet else os.path.join(data_dir, f"{table}.csv")
+
+    with table_load("ingest_data", table) as stats:
+        # Each table loads on its own connection so tables can run in parallel
+        conn = connect()
+        try:
+            if parquet:
+                # Parquet files are rewritten rather than appended to: the watermark alone marks progress
+                offset, checksum = 0, None
+                columns = TABLES[table].column_names
+            else:
+                # Taken before reading: rows appended meanwhile are re-read next run and filtered by the watermark
+                offset = resume_offset(file_path)
+                checksum = file_checksum(file_path, offset)
+                columns = read_csv_header(file_path)
+
+            create_table_if_not_exists(conn, table)
+            create_versions_table(conn)
+            if incremental and get_load_state(conn, table)[0] is None and is_empty(conn, table):
+                # Nothing loaded yet (first run, or a reload after a truncate): the full path's raw COPY
+                # and single index build beat staging and merging every row
+                incremental = False
+            # Full loads add every row to the rollups; incremental ones stage the rows and only add
+            # those that are new (upsert_stream_to_db), like the API extractor
+            rollup = RollupDelta() if table == "transactions" and not incremental else None
+
+            curr = conn.cursor()
+            if rollup:
+                # Before the COPY: rollups created now are backfilled from the rows already loaded,
+                # and this batch is then added by the delta
+                create_rollup_tables(curr, "public")
+            if incremental:
+                # ON CONFLICT needs the primary key before the merge
+                ensure_indexes(curr, table)
+                state = get_load_state(conn, table)
+                if parquet:
+                    stream = parquet_stream(table, file_path, columns, chunk_rows, state[0], rollup, copy_format)
+                else:
+                    stream = chunk_stream(
+                        table, read_new_chunks(table, file_path, state, chunk_rows), rollup, copy_format
+                    )
+                rows, watermark = upsert_stream_to_db(curr, table, stream, columns, stats)
+            else:
+                if TABLES[table].partition_key:
+                    # COPY can't create partitions as it goes: make every month in the input exist first
+                    with stats.timed("partitions"):
+                        bounds = partition_bounds(table, file_path, input_format, chunk_rows)
+                        ensure_month_partitions(curr, "public", table, *bounds)
+                if parquet:
+                    stream = parquet_stream(table, file_path, columns, chunk_rows, rollup=rollup, copy_format=copy_format)
+                    rows, watermark = copy_stream_to_db(curr, table, stream, columns, stats)
+                elif table in TRANSFORMED_TABLES or copy_format == "binary":
+                    # Binary COPY needs typed values, so the file is parsed rather than passed through
+                    stream = chunk_stream(table, read_csv_chunks(table, file_path, chunk_rows), rollup, copy_format)
+                    rows, watermark = copy_stream_to_db(curr, table, stream, columns, stats)
+                else:
+                    rows, watermark = copy_raw_file(curr, table, file_path, columns, stats)
+                # Keys and indexes are built once over the loaded data, not maintained per row during COPY
+                with stats.timed("index"):
+                    ensure_indexes(curr, table)
+
+            if rollup:
+                with stats.timed("rollup"):
+                    rollup.apply(curr, "public")
+            if rows:
+                # Committed with the rows, so the API never sees new data under an old version
+                bump_versions(curr, "public", [table])
+            save_load_state(curr, table, watermark, offset, checksum)
+            conn.commit()
+            curr.close()
+            stats.rows = rows
+            return rows, watermark
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+def analyze_tables(tables=None):
+    """Refresh planner statistics after a load so new data gets good plans straight away"""
+    conn = connect()
+    conn.autocommit = True
+    try:
+        curr = conn.cursor()
+        for table in list(tables or TABLES) + ROLLUP_TABLES:
+            curr.execute("SELECT to_regclass(%s)", (f"public.{table}",))
+            if curr.fetchone()[0] is not None:
+                curr.execute(f"ANALYZE public.{table}")
+        curr.close()
+    finally:
+        conn.close()
+
+def load_all(incremental=False, workers=LOAD_WORKERS, chunk_rows=CHUNK_ROWS, input_format=INPUT_FORMAT,
+             data_dir=DATA_DIR, copy_format=COPY_FORMAT):
+    """Load every table, level by level, returning the rows loaded per table"""
+    conn = connect()
+    create_state_table(conn)
+    conn.close()
+
+    loaded = {}
+    # Tables within a level are independent; each level waits for the tables it references
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for level in load_order():
+            futures = {
+                executor.submit(
+                    load_table, table, incremental, chunk_rows, input_format, data_dir, copy_format
+                ): table
+                for table in level
+            }
+            for future in as_completed(futures):
+                rows, _ = future.result()
+                loaded[futures[future]] = rows
+                print(f"Ingested {rows} rows into {futures[future]} table.")
+    return loaded
+
 def main():
-    tables = [
-        "products",
-        "customers",
-        "stores",
-        "suppliers",
-        "inventory",
-        "transactions",
-        "returns",
-        "promotions"
-    ]
-    
-    for table in tables:
-        file_path = f"./data/{table}.csv"
-        df = read_data_from_csv(file_path)
-        create_table_if_not_exists(table, df)
-        ingest_csv_to_db(table, df)
-        print(f"Ingested data into {table} table.")
-
-# main()
-
-query = "SELECT count(product_id) FROM public.products"
-curr = conn.cursor()
-curr.execute(query)
-print(curr.fetchall())
-
-conn.close()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the retail CSVs into Postgres")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Load only rows past each table's watermark and upsert them on the natural key"
+    )
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS, help="Tables loaded in parallel")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows parsed per chunk")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=INPUT_FORMAT, help="Input file format")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory holding the input files")
+    parser.add_argument(
+        "--copy-format", choices=["csv", "binary"], default=COPY_FORMAT, help="Wire format sent to COPY"
+    )
+    args = parser.parse_args()
+    # Per-table timings are logged by data.load_metrics
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    load_all(args.incremental, args.workers, args.chunk_rows, args.format, args.data_dir, args.copy_format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Per-table load timings for the loaders: one structured log line per table.
+
+Each load reports rows, bytes sent to COPY, the COPY duration, the total
+duration and rows/sec as a JSON log line. With PUSHGATEWAY_URL set the same
+figures are also pushed to a Prometheus Pushgateway (grouped by job and table),
+since a batch run exits long before anything could scrape it.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+PUSHGATEWAY_URL = os.getenv("PUSHGATEWAY_URL")
+
+
+class LoadStats:
+    """Figures for one table load, filled in by the loader as it goes"""
+
+    def __init__(self, job, table):
+        self.job = job
+        self.table = table
+        self.rows = 0
+        # Length of what COPY read: bytes for files and binary streams, characters for CSV text
+        self.bytes = 0
+        self.seconds = {}
+        self.status = "ok"
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def timed(self, phase):
+        """Add the block's duration to `phase` (copy, merge...)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + time.perf_counter() - started
+
+    def as_dict(self):
+        total = time.perf_counter() - self._started
+        copy = self.seconds.get("copy", 0.0)
+        return {
+            "event": "table_load",
+            "job": self.job,
+            "table": self.table,
+            "status": self.status,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            **{f"{phase}_s": round(seconds, 3) for phase, seconds in self.seconds.items()},
+            "total_s": round(total, 3),
+            # COPY pulls its input lazily, so its duration includes reading and encoding the source
+            "rows_per_s": round(self.rows / copy) if copy else None,
+        }
+
+
+def timed(stats, phase):
+    """stats.timed(phase), or a no-op when the caller isn't collecting stats"""
+    return stats.timed(phase) if stats is not None else nullcontext()
+
+
+@contextmanager
+def table_load(job, table):
+    """Collect a LoadStats for the block and report it when the block exits, failed or not"""
+    stats = LoadStats(job, table)
+    try:
+        yield stats
+    except BaseException:
+        stats.status = "failed"
+        raise
+    finally:
+        report(stats)
+
+
+def report(stats):
+    figures = stats.as_dict()
+    logger.info(json.dumps(figures))
+    if PUSHGATEWAY_URL:
+        try:
+            push(figures)
+        except Exception:
+            # Metrics must never fail a load
+            logger.warning("Could not push load metrics for %s to %s", stats.table, PUSHGATEWAY_URL, exc_info=True)
+
+
+def push(figures):
+    # Only needed when pushing; the loaders otherwise run without prometheus_client
+    from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+
+    registry = CollectorRegistry()
+    labels = {"status": figures["status"]}
+    for key, name, description in [
+        ("rows", "retail_load_rows", "Rows loaded"),
+        ("bytes", "retail_load_bytes", "Bytes (or characters) sent to COPY"),
+        ("copy_s", "retail_load_copy_seconds", "Seconds spent in COPY"),
+        ("merge_s", "retail_load_merge_seconds", "Seconds spent merging staged rows"),
+        ("total_s", "retail_load_total_seconds", "Seconds for the whole table load"),
+        ("rows_per_s", "retail_load_rows_per_second", "Rows loaded per second of COPY"),
+    ]:
+        if figures.get(key) is not None:
+            gauge = Gauge(name, description, list(labels), registry=registry)
+            gauge.labels(**labels).set(figures[key])
+    push_to_gateway(
+        PUSHGATEWAY_URL, job=figures["job"], grouping_key={"table": figures["table"]}, registry=registry
+    )
@@ -0,0 +1,92 @@
+"""Parquet input for the loaders: Arrow record batches encoded straight to COPY CSV.
+
+Batches go from the Parquet row groups to pyarrow's CSV writer without a
+pandas DataFrame in between. pyarrow is imported when a Parquet load runs,
+so CSV-only setups don't need it installed.
+"""
+import os
+
+from data.copy_stream import IterStream
+from data.schema import TABLES
+
+# Tables written as hive-style partitioned directories, and the column they are partitioned on
+PARTITION_COLUMNS = {"transactions": "transaction_date"}
+
+# Columns RollupDelta needs from each transactions batch
+ROLLUP_COLUMNS = ["transaction_id", "store_id", "product_id", "transaction_date", "total_amount"]
+
+
+def parquet_path(data_dir, table_name):
+    # A single file, or a directory of partitions for tables in PARTITION_COLUMNS
+    return os.path.join(data_dir, f"{table_name}.parquet")
+
+
+def open_dataset(table_name, path):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = None
+    if table_name in PARTITION_COLUMNS:
+        # Partition values only live in directory names; give them their registry type
+        partitioning = ds.partitioning(pa.schema([(PARTITION_COLUMNS[table_name], pa.date32())]), flavor="hive")
+    return ds.dataset(path, format="parquet", partitioning=partitioning)
+
+
+def record_batches(table_name, path, columns, batch_rows, watermark=None):
+    """Yield Arrow tables of about `batch_rows` rows, optionally only rows past the watermark"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    key = TABLES[table_name].primary_key
+    # The watermark filter is pushed down, so row groups entirely below it are skipped unread
+    row_filter = ds.field(key) > watermark if watermark is not None else None
+    scanner = open_dataset(table_name, path).scanner(columns=columns, filter=row_filter, batch_size=batch_rows)
+
+    # Partitioned files can have small row groups; regroup them so each COPY chunk is a useful size
+    pending, pending_rows = [], 0
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+        if pending_rows >= batch_rows:
+            yield pa.Table.from_batches(pending)
+            pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def column_bounds(table_name, path, column):
+    """min and max of one column; a partition column comes from the directory names alone"""
+    import pyarrow.compute as pc
+
+    bounds = pc.min_max(open_dataset(table_name, path).to_table(columns=[column])[column])
+    return bounds["min"].as_py(), bounds["max"].as_py()
+
+
+class ArrowCopyStream(IterStream):
+    """Encodes Arrow tables as CSV bytes for COPY"""
+
+    empty = b""
+    copy_options = "CSV"
+
+    def __init__(self, tables, key, on_chunk=None):
+        self.key = key
+        self.on_chunk = on_chunk
+        self.rows = 0
+        self.watermark = None
+        super().__init__(self._encode(table) for table in tables)
+
+    def _encode(self, table):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+
+        self.rows += table.num_rows
+        chunk_max = pc.max(table[self.key]).as_py()
+        self.watermark = chunk_max if self.watermark is None else max(self.watermark, chunk_max)
+        if self.on_chunk:
+            self.on_chunk(table)
+
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table, sink, pacsv.WriteOptions(include_header=False))
+        return sink.getvalue().to_pybytes()
@@ -0,0 +1,155 @@
+"""Monthly range partitions for the tables with a partition_key in the schema registry.
+
+The loaders call ensure_month_partitions before rows reach a partitioned table,
+so every month they write has its partition. There is no default partition: a
+row outside every partition fails the load rather than landing in a catch-all
+that later partitions would have to be carved out of.
+
+Old months leave the table by detaching their partitions. That is a catalog
+change, not a DELETE, and CONCURRENTLY (Postgres 14+) doesn't block queries.
+Detached partitions stay behind as plain tables until archived or dropped.
+Each detach bumps the table's version (data.versions), so the API stops serving
+cached results that include the detached months. The rollups keep counting
+them; `python -m data.rollups rebuild` recomputes them from what is left.
+
+    python -m data.partitions list
+    python -m data.partitions detach --before 2023-01-01          # keep as tables
+    python -m data.partitions detach --before 2023-01-01 --drop   # discard
+"""
+import argparse
+import datetime
+import re
+
+from data.schema import TABLES
+from data.versions import bump_versions, create_versions_table
+
+PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    first = month_start(day)
+    return first.replace(year=first.year + 1, month=1) if first.month == 12 else first.replace(month=first.month + 1)
+
+
+def partition_name(table_name, month):
+    return f"{table_name}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name):
+    match = PARTITION_SUFFIX.search(name)
+    return datetime.date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned(curr, schema, table_name):
+    curr.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", (f"{schema}.{table_name}",))
+    row = curr.fetchone()
+    return bool(row and row[0])
+
+
+def list_partitions(curr, schema, table_name):
+    """(name, bounds, estimated rows) of each partition, oldest first"""
+    curr.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::BIGINT
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+    """, (f"{schema}.{table_name}",))
+    return curr.fetchall()
+
+
+def ensure_month_partitions(curr, schema, table_name, start, end):
+    """Create the missing monthly partitions covering the dates start..end (caller commits)"""
+    if start is None or end is None or not is_partitioned(curr, schema, table_name):
+        # No rows, or a table created before partitioning: it keeps working unpartitioned
+        return []
+    # Loads of the same table from two runs would race on CREATE TABLE otherwise
+    curr.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"{schema}.{table_name} partitions",))
+    existing = {name for name, _, _ in list_partitions(curr, schema, table_name)}
+    created = []
+    month = month_start(start)
+    while month <= end:
+        name = partition_name(table_name, month)
+        if name not in existing:
+            curr.execute(
+                f"CREATE TABLE {schema}.{name} PARTITION OF {schema}.{table_name} FOR VALUES FROM (%s) TO (%s)",
+                (month, next_month(month)),
+            )
+            created.append(name)
+        month = next_month(month)
+    return created
+
+
+def ensure_partitions_for(curr, schema, table_name, source):
+    """ensure_month_partitions for the dates in `source` (a staging table about to be merged)"""
+    key = TABLES[table_name].partition_key
+    curr.execute(f"SELECT min({key}), max({key}) FROM {source}")
+    start, end = curr.fetchone()
+    return ensure_month_partitions(curr, schema, table_name, start, end)
+
+
+def detach_partitions(conn, schema, table_name, before, drop=False, concurrently=True):
+    """Detach every monthly partition entirely before the date `before`, returning their names"""
+    create_versions_table(conn)
+    # DETACH ... CONCURRENTLY can't run inside a transaction block
+    conn.autocommit = True
+    curr = conn.cursor()
+    detached = []
+    for name, _, _ in list_partitions(curr, schema, table_name):
+        month = partition_month(name)
+        if month is None or next_month(month) > before:
+            continue
+        curr.execute(
+            f"ALTER TABLE {schema}.{table_name} DETACH PARTITION {schema}.{name}"
+            f"{' CONCURRENTLY' if concurrently else ''}"
+        )
+        if drop:
+            curr.execute(f"DROP TABLE {schema}.{name}")
+        detached.append(name)
+    if detached:
+        # The table now returns fewer rows without any new load_date: tell the API's cache and ETags
+        bump_versions(curr, schema, [table_name])
+    curr.close()
+    return detached
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of partitioned tables")
+    parser.add_argument("command", choices=["list", "detach"])
+    parser.add_argument("--schema", default="public", help="Schema holding the table (public or apis)")
+    parser.add_argument(
+        "--table", default="transactions", choices=[name for name, t in TABLES.items() if t.partition_key]
+    )
+    parser.add_argument("--before", type=datetime.date.fromisoformat, help="detach: months entirely before this date")
+    parser.add_argument("--drop", action="store_true", help="detach: drop the partitions instead of keeping them")
+    parser.add_argument(
+        "--no-concurrently", dest="concurrently", action="store_false", help="detach: plain DETACH (Postgres < 14)"
+    )
+    args = parser.parse_args()
+    if args.command == "detach" and args.before is None:
+        parser.error("detach needs --before")
+
+    # Imported here: data.ingest_data imports this module
+    from data.ingest_data import connect
+
+    conn = connect()
+    try:
+        if args.command == "list":
+            curr = conn.cursor()
+            for name, bounds, rows in list_partitions(curr, args.schema, args.table):
+                print(f"{name}\t{bounds}\t~{max(rows, 0)} rows")
+            curr.close()
+        else:
+            detached = detach_partitions(conn, args.schema, args.table, args.before, args.drop, args.concurrently)
+            action = "Dropped" if args.drop else "Detached"
+            print(f"{action} {len(detached)} partitions of {args.schema}.{args.table}: {', '.join(detached) or '-'}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import decimal
+
+from data.schema import primary_key_columns
+from data.versions import bump_versions, create_versions_table
+
+# Per-store and per-product sales totals maintained alongside <schema>.transactions
+STORE_ROLLUP = "store_sales_rollup"
+PRODUCT_ROLLUP = "product_sales_rollup"
+# The same totals per day, for analytics over a date range
+STORE_DAILY_ROLLUP = "store_daily_sales_rollup"
+PRODUCT_DAILY_ROLLUP = "product_daily_sales_rollup"
+ROLLUP_TABLES = [STORE_ROLLUP, PRODUCT_ROLLUP, STORE_DAILY_ROLLUP, PRODUCT_DAILY_ROLLUP]
+
+# Sums of NUMERIC(12,2) amounts: exact, so incremental deltas always agree with a rebuild
+MONEY_TOTAL = "NUMERIC(14,2)"
+MONEY_COLUMNS = {
+    STORE_ROLLUP: "total_sales",
+    PRODUCT_ROLLUP: "total_revenue",
+    STORE_DAILY_ROLLUP: "total_sales",
+    PRODUCT_DAILY_ROLLUP: "total_revenue",
+}
+
+
+def _rebuild_statements(schema):
+    """INSERT ... SELECT filling each (empty) rollup from <schema>.transactions"""
+    return {
+        STORE_ROLLUP: f"""
+            INSERT INTO {schema}.{STORE_ROLLUP} (store_id, transaction_count, total_sales)
+            SELECT store_id, COUNT(transaction_id), COALESCE(SUM(total_amount), 0)
+            FROM {schema}.transactions
+            WHERE store_id IS NOT NULL
+            GROUP BY store_id;
+        """,
+        PRODUCT_ROLLUP: f"""
+            INSERT INTO {schema}.{PRODUCT_ROLLUP} (product_id, sales_count, total_revenue)
+            SELECT product_id, COUNT(transaction_id), COALESCE(SUM(total_amount), 0)
+            FROM {schema}.transactions
+            WHERE product_id IS NOT NULL
+            GROUP BY product_id;
+        """,
+        STORE_DAILY_ROLLUP: f"""
+            INSERT INTO {schema}.{STORE_DAILY_ROLLUP} (store_id, sales_date, transaction_count, total_sales)
+            SELECT store_id, transaction_date, COUNT(transaction_id), COALESCE(SUM(total_amount), 0)
+            FROM {schema}.transactions
+            WHERE store_id IS NOT NULL
+            GROUP BY store_id, transaction_date;
+        """,
+        PRODUCT_DAILY_ROLLUP: f"""
+            INSERT INTO {schema}.{PRODUCT_DAILY_ROLLUP} (product_id, sales_date, sales_count, total_revenue)
+            SELECT product_id, transaction_date, COUNT(transaction_id), COALESCE(SUM(total_amount), 0)
+            FROM {schema}.transactions
+            WHERE product_id IS NOT NULL
+            GROUP BY product_id, transaction_date;
+        """,
+    }
+
+
+def create_rollup_tables(curr, schema):
+    """Create the missing rollups, filled from the rows already in <schema>.transactions.
+
+    Call it before adding a batch to <schema>.transactions, or a new rollup would
+    count the batch twice. The daily rollups added to an existing database are
+    backfilled this way on its next load. The caller has created the versions
+    table, and commits.
+    """
+    # Loaders of the same schema would race on CREATE TABLE and the backfill otherwise
+    curr.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"{schema} rollups",))
+    curr.execute(
+        "SELECT name FROM unnest(%s::TEXT[]) AS name WHERE to_regclass(%s || '.' || name) IS NULL",
+        (ROLLUP_TABLES, schema),
+    )
+    missing = [row[0] for row in curr.fetchall()]
+    curr.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{STORE_ROLLUP} (
+            store_id BIGINT PRIMARY KEY,
+            transaction_count BIGINT NOT NULL,
+            total_sales {MONEY_TOTAL} NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS {schema}.{PRODUCT_ROLLUP} (
+            product_id BIGINT PRIMARY KEY,
+            sales_count BIGINT NOT NULL,
+            total_revenue {MONEY_TOTAL} NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS {schema}.{STORE_DAILY_ROLLUP} (
+            store_id BIGINT NOT NULL,
+            sales_date DATE NOT NULL,
+            transaction_count BIGINT NOT NULL,
+            total_sales {MONEY_TOTAL} NOT NULL,
+            PRIMARY KEY (store_id, sales_date)
+        );
+        CREATE TABLE IF NOT EXISTS {schema}.{PRODUCT_DAILY_ROLLUP} (
+            product_id BIGINT NOT NULL,
+            sales_date DATE NOT NULL,
+            sales_count BIGINT NOT NULL,
+            total_revenue {MONEY_TOTAL} NOT NULL,
+            PRIMARY KEY (product_id, sales_date)
+        );
+        CREATE INDEX IF NOT EXISTS {STORE_DAILY_ROLLUP}_sales_date_idx ON {schema}.{STORE_DAILY_ROLLUP} (sales_date);
+        CREATE INDEX IF NOT EXISTS {PRODUCT_DAILY_ROLLUP}_sales_date_idx ON {schema}.{PRODUCT_DAILY_ROLLUP} (sales_date);
+    """)
+    # Rollups created with DOUBLE PRECISION totals are converted in place; run
+    # `python -m data.rollups rebuild` once afterwards to drop any drift they accumulated
+    curr.execute("""
+        SELECT table_name, column_name FROM information_schema.columns
+        WHERE table_schema = %s AND data_type = 'double precision'
+          AND (table_name, column_name) IN %s
+    """, (schema, tuple(MONEY_COLUMNS.items())))
+    for table, column in curr.fetchall():
+        curr.execute(f"ALTER TABLE {schema}.{table} ALTER COLUMN {column} TYPE {MONEY_TOTAL}")
+
+    curr.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.transactions",))
+    if missing and curr.fetchone()[0]:
+        statements = _rebuild_statements(schema)
+        curr.execute("".join(statements[table] for table in missing))
+        bump_versions(curr, schema, missing)
+
+
+class RollupDelta:
+    """Accumulates per-store and per-product sales deltas across transaction batches"""
+
+    def __init__(self):
+        self.by_store = None
+        self.by_product = None
+        self.by_store_day = None
+        self.by_product_day = None
+
+    @staticmethod
+    def _accumulate(total, delta):
+        return delta if total is None else total.add(delta, fill_value=0)
+
+    @staticmethod
+    def _money(cents):
+        return decimal.Decimal(int(cents)).scaleb(-2)
+
+    def add(self, df):
+        if df.empty:
+            return
+        import numpy as np
+
+        from data.pgbinary import numeric_units
+
+        # Summed in whole cents, which float64 holds exactly, so the totals match a rebuild's NUMERIC
+        # sums; rounded the way the NUMERIC(12,2) column rounds the same value on load (NULL adds 0)
+        amounts = df["total_amount"].to_numpy(dtype="float64", na_value=0.0)
+        df = df.assign(total_amount=np.sign(amounts) * numeric_units(amounts, 2))
+        store_sales = dict(transaction_count=("transaction_id", "count"), total_sales=("total_amount", "sum"))
+        product_sales = dict(sales_count=("transaction_id", "count"), total_revenue=("total_amount", "sum"))
+        # Only the running sums are kept, so memory is bounded by (stores + products) x days
+        self.by_store = self._accumulate(self.by_store, df.groupby("store_id").agg(**store_sales))
+        self.by_product = self._accumulate(self.by_product, df.groupby("product_id").agg(**product_sales))
+        self.by_store_day = self._accumulate(
+            self.by_store_day, df.groupby(["store_id", "transaction_date"]).agg(**store_sales)
+        )
+        self.by_product_day = self._accumulate(
+            self.by_product_day, df.groupby(["product_id", "transaction_date"]).agg(**product_sales)
+        )
+
+    def apply(self, curr, schema):
+        """Upsert the accumulated deltas (caller commits with the batch)"""
+        if self.by_store is None:
+            return
+        from psycopg2.extras import execute_values
+
+        create_rollup_tables(curr, schema)
+
+        execute_values(curr, f"""
+            INSERT INTO {schema}.{STORE_ROLLUP} AS r (store_id, transaction_count, total_sales)
+            VALUES %s
+            ON CONFLICT (store_id) DO UPDATE SET
+                transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+                total_sales = r.total_sales + EXCLUDED.total_sales
+        """, [(int(k), int(row.transaction_count), self._money(row.total_sales)) for k, row in self.by_store.iterrows()])
+
+        execute_values(curr, f"""
+            INSERT INTO {schema}.{PRODUCT_ROLLUP} AS r (product_id, sales_count, total_revenue)
+            VALUES %s
+            ON CONFLICT (product_id) DO UPDATE SET
+                sales_count = r.sales_count + EXCLUDED.sales_count,
+                total_revenue = r.total_revenue + EXCLUDED.total_revenue
+        """, [(int(k), int(row.sales_count), self._money(row.total_revenue)) for k, row in self.by_product.iterrows()])
+
+        import pandas as pd
+
+        # Dates arrive as datetime64 (CSV) or datetime.date (Parquet); both become DATE values
+        execute_values(curr, f"""
+            INSERT INTO {schema}.{STORE_DAILY_ROLLUP} AS r (store_id, sales_date, transaction_count, total_sales)
+            VALUES %s
+            ON CONFLICT (store_id, sales_date) DO UPDATE SET
+                transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+                total_sales = r.total_sales + EXCLUDED.total_sales
+        """, [
+            (int(store), pd.Timestamp(day).date(), int(row.transaction_count), self._money(row.total_sales))
+            for (store, day), row in self.by_store_day.iterrows()
+        ], page_size=1000)
+
+        execute_values(curr, f"""
+            INSERT INTO {schema}.{PRODUCT_DAILY_ROLLUP} AS r (product_id, sales_date, sales_count, total_revenue)
+            VALUES %s
+            ON CONFLICT (product_id, sales_date) DO UPDATE SET
+                sales_count = r.sales_count + EXCLUDED.sales_count,
+                total_revenue = r.total_revenue + EXCLUDED.total_revenue
+        """, [
+            (int(product), pd.Timestamp(day).date(), int(row.sales_count), self._money(row.total_revenue))
+            for (product, day), row in self.by_product_day.iterrows()
+        ], page_size=1000)
+        bump_versions(curr, schema, ROLLUP_TABLES)
+
+
+def apply_staged_transactions(curr, schema, stage_table):
+    """Add staged transactions that are not yet in <schema>.transactions to the rollups.
+
+    Must run before the stage is merged into the target table. The caller has
+    created the versions table.
+    """
+    create_rollup_tables(curr, schema)
+    # On the key the merge will conflict on, so "new" means exactly the rows it inserts
+    keys = primary_key_columns(curr, schema, "transactions")
+    new_rows = f"""
+        FROM {stage_table} s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {schema}.transactions t
+            WHERE {' AND '.join(f"t.{key} = s.{key}" for key in keys)}
+        )
+    """
+    curr.execute(f"""
+        INSERT INTO {schema}.{STORE_ROLLUP} AS r (store_id, transaction_count, total_sales)
+        SELECT s.store_id, COUNT(s.transaction_id), COALESCE(SUM(s.total_amount), 0)
+        {new_rows}
+        GROUP BY s.store_id
+        ON CONFLICT (store_id) DO UPDATE SET
+            transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+            total_sales = r.total_sales + EXCLUDED.total_sales;
+
+        INSERT INTO {schema}.{PRODUCT_ROLLUP} AS r (product_id, sales_count, total_revenue)
+        SELECT s.product_id, COUNT(s.transaction_id), COALESCE(SUM(s.total_amount), 0)
+        {new_rows}
+        GROUP BY s.product_id
+        ON CONFLICT (product_id) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            total_revenue = r.total_revenue + EXCLUDED.total_revenue;
+
+        INSERT INTO {schema}.{STORE_DAILY_ROLLUP} AS r (store_id, sales_date, transaction_count, total_sales)
+        SELECT s.store_id, s.transaction_date, COUNT(s.transaction_id), COALESCE(SUM(s.total_amount), 0)
+        {new_rows}
+        GROUP BY s.store_id, s.transaction_date
+        ON CONFLICT (store_id, sales_date) DO UPDATE SET
+            transaction_count = r.transaction_count + EXCLUDED.transaction_count,
+            total_sales = r.total_sales + EXCLUDED.total_sales;
+
+        INSERT INTO {schema}.{PRODUCT_DAILY_ROLLUP} AS r (product_id, sales_date, sales_count, total_revenue)
+        SELECT s.product_id, s.transaction_date, COUNT(s.transaction_id), COALESCE(SUM(s.total_amount), 0)
+        {new_rows}
+        GROUP BY s.product_id, s.transaction_date
+        ON CONFLICT (product_id, sales_date) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            total_revenue = r.total_revenue + EXCLUDED.total_revenue;
+    """)
+    bump_versions(curr, schema, ROLLUP_TABLES)
+
+
+def rebuild_rollups(conn, schema):
+    """Recompute every rollup from scratch from <schema>.transactions (backfills, repairs, detached months)"""
+    create_versions_table(conn)
+    curr = conn.cursor()
+    create_rollup_tables(curr, schema)
+    curr.execute(f"TRUNCATE {', '.join(f'{schema}.{table}' for table in ROLLUP_TABLES)}")
+    curr.execute("".join(_rebuild_statements(schema).values()))
+    # The API serves these rollups: its cached results and ETags must not outlive the rebuild
+    bump_versions(curr, schema, ROLLUP_TABLES)
+    conn.commit()
+    curr.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain analytics rollup tables")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--schema", default="public", help="Schema holding transactions (public or apis)")
+    args = parser.parse_args()
+
+    # Imported here: data.ingest_data imports this module
+    from data.ingest_data import connect
+
+    conn = connect()
+    try:
+        rebuild_rollups(conn, args.schema)
+        print(f"Rebuilt rollups in {args.schema} schema.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Schema registry for the eight retail tables.
+
+Single source of truth for the pandas dtypes the loaders read with and the
+Postgres DDL, keys and indexes both loaders create (public.* from CSV,
+apis.* from the API).
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    pg_type: str
+    dtype: Optional[str]  # pandas read dtype; None for date columns (parsed instead)
+    nullable: bool = True
+
+
+@dataclass(frozen=True)
+class Table:
+    name: str
+    columns: Tuple[Column, ...]
+    primary_key: str
+    # column -> (referenced table, referenced column)
+    foreign_keys: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    # Secondary indexes backing the API's filters, keyset ordering and joins
+    indexes: Tuple[Tuple[str, ...], ...] = ()
+    # DATE column the table is range-partitioned on, one partition per month (data/partitions.py)
+    partition_key: Optional[str] = None
+
+    @property
+    def column_names(self) -> List[str]:
+        return [col.name for col in self.columns]
+
+    @property
+    def key_columns(self) -> List[str]:
+        """Primary key / ON CONFLICT columns; on a partitioned table they must include the partition key"""
+        return [self.primary_key] + ([self.partition_key] if self.partition_key else [])
+
+
+def _id(name, pg_type="INTEGER"):
+    dtype = {"SMALLINT": "int16", "INTEGER": "int32", "BIGINT": "int64"}[pg_type]
+    return Column(name, pg_type, dtype, nullable=False)
+
+
+def _text(name):
+    return Column(name, "TEXT", "string")
+
+
+def _category(name):
+    # Low-cardinality labels: stored as TEXT, held as pandas categoricals while loading
+    return Column(name, "TEXT", "category")
+
+
+def _money(name):
+    return Column(name, "NUMERIC(12,2)", "float64")
+
+
+def _date(name, nullable=True):
+    return Column(name, "DATE", None, nullable)
+
+
+TABLES: Dict[str, Table] = {
+    "products": Table(
+        "products",
+        (
+            _id("product_id"),
+            _text("sku"),
+            _text("product_name"),
+            _category("category"),
+            _money("cost"),
+            _money("price"),
+        ),
+        primary_key="product_id",
+        indexes=(("category", "product_id"),),
+    ),
+    "customers": Table(
+        "customers",
+        (
+            _id("customer_id"),
+            _text("name"),
+            _text("email"),
+            _text("city"),
+            _category("loyalty_tier"),
+        ),
+        primary_key="customer_id",
+    ),
+    "stores": Table(
+        "stores",
+        (
+            _id("store_id"),
+            _text("store_name"),
+            _text("city"),
+            _category("store_type"),
+        ),
+        primary_key="store_id",
+    ),
+    "suppliers": Table(
+        "suppliers",
+        (
+            _id("supplier_id"),
+            _text("supplier_name"),
+            _text("country"),
+            Column("lead_time_days", "SMALLINT", "int16"),
+        ),
+        primary_key="supplier_id",
+    ),
+    "inventory": Table(
+        "inventory",
+        (
+            _id("inventory_id"),
+            _id("product_id"),
+            _id("store_id"),
+            Column("stock_on_hand", "INTEGER", "int32"),
+            Column("reorder_level", "SMALLINT", "int16"),
+        ),
+        primary_key="inventory_id",
+        foreign_keys={"product_id": ("products", "product_id"), "store_id": ("stores", "store_id")},
+        indexes=(("store_id", "inventory_id"), ("product_id", "inventory_id")),
+    ),
+    "transactions": Table(
+        "transactions",
+        (
+            _id("transaction_id", "BIGINT"),
+            _id("customer_id"),
+            _id("product_id"),
+            _id("store_id"),
+            Column("quantity", "SMALLINT", "int16"),
+            _date("transaction_date", nullable=False),
+            _money("total_amount"),
+        ),
+        primary_key="transaction_id",
+        partition_key="transaction_date",
+        foreign_keys={
+            "customer_id": ("customers", "customer_id"),
+            "product_id": ("products", "product_id"),
+            "store_id": ("stores", "store_id"),
+        },
+        indexes=(("customer_id", "transaction_id"), ("store_id", "transaction_id"), ("product_id",)),
+    ),
+    "returns": Table(
+        "returns",
+        (
+            _id("return_id", "BIGINT"),
+            _id("transaction_id", "BIGINT"),
+            _category("reason"),
+            _money("refund_amount"),
+        ),
+        primary_key="return_id",
+        # No foreign key to transactions: a partitioned table's transaction_id alone isn't
+        # unique to Postgres (its key includes transaction_date), so nothing can reference it
+        indexes=(("transaction_id",),),
+    ),
+    "promotions": Table(
+        "promotions",
+        (
+            _id("promotion_id"),
+            _text("promo_name"),
+            Column("discount_pct", "SMALLINT", "int16"),
+            _date("start_date"),
+            _date("end_date"),
+        ),
+        primary_key="promotion_id",
+    ),
+}
+
+
+def read_csv_options(table_name: str) -> dict:
+    """Keyword arguments for pd.read_csv that give compact, correctly typed frames"""
+    table = TABLES[table_name]
+    return {
+        "dtype": {col.name: col.dtype for col in table.columns if col.dtype},
+        "parse_dates": [col.name for col in table.columns if col.pg_type == "DATE"],
+    }
+
+
+def create_table_sql(schema: str, table_name: str, extra_columns=()) -> str:
+    """CREATE TABLE IF NOT EXISTS statement with typed columns.
+
+    Keys and indexes are left to index_statements so bulk loads can build them
+    after COPY instead of maintaining them row by row. Partitioned tables are
+    created without partitions; see data.partitions.ensure_month_partitions.
+    """
+    table = TABLES[table_name]
+    definitions = [
+        f"{col.name} {col.pg_type}{'' if col.nullable else ' NOT NULL'}" for col in table.columns
+    ]
+    definitions.extend(f"{name} {pg_type}" for name, pg_type in extra_columns)
+    partitioning = f" PARTITION BY RANGE ({table.partition_key})" if table.partition_key else ""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{table_name} (
+            {', '.join(definitions)}
+        ){partitioning};
+    """
+
+
+def _add_constraint_sql(schema: str, table_name: str, name: str, match: str, definition: str) -> str:
+    # ALTER TABLE has no ADD CONSTRAINT IF NOT EXISTS; check the catalog first
+    return f"""
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conrelid = '{schema}.{table_name}'::regclass AND {match}
+            ) THEN
+                ALTER TABLE {schema}.{table_name} ADD CONSTRAINT {name} {definition};
+            END IF;
+        END $$;
+    """
+
+
+def index_statements(schema: str, table_name: str, foreign_keys=True, extra_indexes=()) -> List[str]:
+    """Idempotent statements creating the primary key, foreign keys and secondary indexes"""
+    table = TABLES[table_name]
+    statements = [
+        _add_constraint_sql(
+            schema, table_name, f"{table_name}_pkey", "contype = 'p'",
+            f"PRIMARY KEY ({', '.join(table.key_columns)})"
+        )
+    ]
+    if foreign_keys:
+        statements.extend(
+            _add_constraint_sql(
+                schema, table_name, f"{table_name}_{col}_fkey", f"conname = '{table_name}_{col}_fkey'",
+                f"FOREIGN KEY ({col}) REFERENCES {schema}.{ref_table} ({ref_col})"
+            )
+            for col, (ref_table, ref_col) in table.foreign_keys.items()
+        )
+    statements.extend(
+        f"CREATE INDEX IF NOT EXISTS {table_name}_{'_'.join(cols)}_idx "
+        f"ON {schema}.{table_name} ({', '.join(cols)})"
+        for cols in tuple(table.indexes) + tuple(extra_indexes)
+    )
+    return statements
+
+
+def primary_key_columns(curr, schema: str, table_name: str) -> List[str]:
+    """Columns of the primary key <schema>.<table_name> actually has, else the declared key_columns.
+
+    A transactions table created before partitioning keeps PRIMARY KEY (transaction_id),
+    and ON CONFLICT has to name exactly that.
+    """
+    curr.execute("""
+        SELECT a.attname
+        FROM pg_constraint c
+        CROSS JOIN unnest(c.conkey) WITH ORDINALITY AS k(attnum, n)
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+        WHERE c.conrelid = to_regclass(%s) AND c.contype = 'p'
+        ORDER BY k.n
+    """, (f"{schema}.{table_name}",))
+    return [row[0] for row in curr.fetchall()] or TABLES[table_name].key_columns
+
+
+def merge_sql(schema: str, table_name: str, source: str, columns: List[str],
+              keys: Optional[List[str]] = None) -> str:
+    """INSERT ... SELECT from a staging table, updating rows that already exist on `keys`
+    (default: the declared key_columns; see primary_key_columns)"""
+    keys = keys or TABLES[table_name].key_columns
+    updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in columns if col not in keys)
+    return f"""
+        INSERT INTO {schema}.{table_name} ({', '.join(columns)})
+        SELECT {', '.join(columns)} FROM {source}
+        ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}
+    """
+
+
+def load_order() -> List[List[str]]:
+    """Tables grouped into levels so every table loads after the tables it references"""
+    remaining = dict(TABLES)
+    done = set()
+    levels = []
+    while remaining:
+        level = [
+            name for name, table in remaining.items()
+            if all(ref in done or ref == name for ref, _ in table.foreign_keys.values())
+        ]
+        if not level:
+            raise ValueError(f"Foreign key cycle between {sorted(remaining)}")
+        levels.append(level)
+        done.update(level)
+        for name in level:
+            del remaining[name]
+    return levels
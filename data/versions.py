@@ -0,0 +1,36 @@
+"""Per-table generation counters: what the API's cache keys and validators are built from.
+
+Every write that changes what a table returns bumps the table's row in
+public.data_versions, in the same transaction as the change: loads, rollup
+maintenance and rebuilds, and partition detaches. The last two change results
+without writing a single load_date, so max(load_date) can't stand in for them.
+"""
+VERSIONS_TABLE = "public.data_versions"
+
+
+def create_versions_table(conn):
+    curr = conn.cursor()
+    # Tables load in parallel: serialize the CREATE so concurrent runs don't collide
+    curr.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (VERSIONS_TABLE,))
+    curr.execute(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL
+        );
+    """)
+    conn.commit()
+    curr.close()
+
+
+def bump_versions(curr, schema, tables):
+    """Mark <schema>.<table> for each table as changed (caller commits with the change)"""
+    # Sorted, so two writers bumping overlapping tables lock the rows in the same order
+    names = sorted(f"{schema}.{table}" for table in tables)
+    curr.execute(f"""
+        INSERT INTO {VERSIONS_TABLE} AS v (table_name, version, updated_at)
+        SELECT name, 1, now() FROM unnest(%s::TEXT[]) AS name
+        ON CONFLICT (table_name) DO UPDATE SET
+            version = v.version + 1,
+            updated_at = EXCLUDED.updated_at
+    """, (names,))
@@ -0,0 +1,72 @@
+import pytest
+
+from APIs import cache
+from APIs.cache import LRUCache, ResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entry_expires_after_its_ttl(clock):
+    lru = LRUCache()
+    lru.set("a", [1], ttl=10)
+    clock[0] += 9.9
+    assert lru.get("a") == [1]
+    clock[0] += 0.2
+    assert lru.get("a") is None
+    assert lru.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    assert lru.get("a") == 1  # b is now the least recently used
+    lru.set("c", 3, ttl=60)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    assert lru.stats()["evictions"] == 1
+
+
+def test_setting_an_existing_key_refreshes_it(clock):
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.set("a", 10, ttl=60)
+    lru.set("c", 3, ttl=60)
+    assert lru.get("a") == 10
+    assert lru.get("b") is None
+
+
+def test_zero_entries_disables_caching(clock):
+    lru = LRUCache(max_entries=0)
+    lru.set("a", 1, ttl=60)
+    assert lru.get("a") is None
+
+
+def test_stats_count_hits_and_misses(clock):
+    lru = LRUCache()
+    lru.set("a", 1, ttl=60)
+    lru.get("a")
+    lru.get("missing")
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    lru.clear()
+    assert lru.stats()["entries"] == 0
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoClear(ResultCache):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        NoClear()
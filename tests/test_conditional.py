@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from starlette.datastructures import Headers
+
+from APIs.conditional import ANALYTICS_TABLES, http_date, make_etag, not_modified, tables_for_path
+
+UPDATED = datetime(2026, 1, 2, 3, 4, 5, 300000, tzinfo=timezone.utc)
+ETAG = make_etag([(3, UPDATED)])
+
+
+def test_tables_for_path():
+    assert tables_for_path("/products") == ("products",)
+    assert tables_for_path("/products/12") == ("products",)
+    assert tables_for_path("/export/transactions") == ("transactions",)
+    assert tables_for_path("/analytics/sales-by-store") == ANALYTICS_TABLES["sales-by-store"]
+    assert "store_daily_sales_rollup" in tables_for_path("/analytics/sales-by-store")
+    assert tables_for_path("/analytics/unknown") is None
+    assert tables_for_path("/export/unknown") is None
+    assert tables_for_path("/metrics") is None
+
+
+def test_etag_is_weak_and_changes_with_any_version():
+    assert ETAG.startswith('W/"')
+    assert ETAG == make_etag([(3, UPDATED)])
+    assert ETAG != make_etag([(4, UPDATED)])
+    assert make_etag([(1, None), (2, None)]) != make_etag([(2, None), (1, None)])
+
+
+def test_if_none_match_compares_weakly():
+    assert not_modified(Headers({"if-none-match": ETAG}), ETAG, UPDATED)
+    assert not_modified(Headers({"if-none-match": ETAG.removeprefix("W/")}), ETAG, UPDATED)
+    assert not_modified(Headers({"if-none-match": f'W/"other", {ETAG}'}), ETAG, UPDATED)
+    assert not_modified(Headers({"if-none-match": "*"}), ETAG, UPDATED)
+    assert not not_modified(Headers({"if-none-match": 'W/"other"'}), ETAG, UPDATED)
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    later = http_date(UPDATED + timedelta(days=1))
+    headers = Headers({"if-none-match": 'W/"other"', "if-modified-since": later})
+    assert not not_modified(headers, ETAG, UPDATED)
+
+
+def test_if_modified_since_needs_an_update_before_that_second():
+    # Last-Modified drops the fraction: a later bump in the same second must not look unmodified
+    assert not not_modified(Headers({"if-modified-since": http_date(UPDATED)}), ETAG, UPDATED)
+    assert not_modified(Headers({"if-modified-since": http_date(UPDATED + timedelta(seconds=1))}), ETAG, UPDATED)
+    assert not not_modified(Headers({"if-modified-since": http_date(UPDATED - timedelta(days=1))}), ETAG, UPDATED)
+
+
+def test_if_modified_since_ignored_without_update_time_or_valid_date():
+    later = http_date(UPDATED + timedelta(days=1))
+    assert not not_modified(Headers({"if-modified-since": later}), ETAG, None)
+    assert not not_modified(Headers({"if-modified-since": "yesterday"}), ETAG, UPDATED)
+    assert not not_modified(Headers({}), ETAG, UPDATED)
+
+
+def test_http_date_is_gmt():
+    local = UPDATED.astimezone(timezone(timedelta(hours=-5)))
+    assert http_date(local) == "Fri, 02 Jan 2026 03:04:05 GMT"
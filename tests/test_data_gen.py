@@ -0,0 +1,60 @@
+import os
+from argparse import Namespace
+
+import pandas as pd
+import pytest
+
+from data import data_gen
+from data.data_gen import main, plan_shards, returns_in_shard
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Several blocks per shard without generating 100k-row blocks
+    monkeypatch.setattr(data_gen, "BLOCK_ROWS", 100)
+
+
+def generate(output_dir, chunk_rows, shards=3):
+    return main([
+        "--seed", "7", "--rows", "20", "--transactions", "1050", "--shards", str(shards),
+        "--workers", "1", "--chunk-rows", str(chunk_rows), "--faker-pool-size", "50",
+        "--output-dir", str(output_dir),
+    ])
+
+
+def read_files(output_dir):
+    return {name: (output_dir / name).read_bytes() for name in sorted(os.listdir(output_dir))}
+
+
+def test_returns_in_shard_counts_per_block(small_blocks):
+    assert returns_in_shard(0, 0.3) == 0
+    assert returns_in_shard(100, 0.3) == 30
+    # Two full blocks and a 55-row tail: 30 + 30 + int(16.5)
+    assert returns_in_shard(255, 0.3) == 76
+
+
+def test_plan_shards_assigns_disjoint_id_ranges(small_blocks):
+    args = Namespace(transactions=1050, shards=4, return_rate=0.3)
+    plan = plan_shards(args)
+    assert [n for _, n, _ in plan] == [263, 263, 262, 262]
+    for (first_id, n, first_return_id), (next_id, _, next_return_id) in zip(plan, plan[1:]):
+        assert next_id == first_id + n
+        assert next_return_id == first_return_id + returns_in_shard(n, 0.3)
+    assert plan[0][0] == plan[0][2] == 1
+
+
+def test_output_depends_on_seed_not_chunk_rows(tmp_path, small_blocks):
+    counts = generate(tmp_path / "a", chunk_rows=100)
+    generate(tmp_path / "b", chunk_rows=250)
+    generate(tmp_path / "c", chunk_rows=100)
+    assert read_files(tmp_path / "a") == read_files(tmp_path / "b") == read_files(tmp_path / "c")
+
+    transactions = pd.read_csv(tmp_path / "a" / "transactions.csv")
+    returns = pd.read_csv(tmp_path / "a" / "returns.csv")
+    assert transactions["transaction_id"].tolist() == list(range(1, 1051))
+    # Return ids planned upfront match the returns actually generated, and every return has its transaction
+    assert counts["returns"] == sum(returns_in_shard(n, 0.3) for _, n, _ in plan_shards(
+        Namespace(transactions=1050, shards=3, return_rate=0.3)
+    ))
+    assert returns["return_id"].tolist() == list(range(1, counts["returns"] + 1))
+    assert returns["transaction_id"].isin(transactions["transaction_id"]).all()
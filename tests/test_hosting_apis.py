@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import APIs.hosting_apis as api
+from APIs.queries import list_query, paginate
+
+
+class FakeDB:
+    """Stands in for run_query: answers every query with `rows` and records the calls"""
+
+    def __init__(self):
+        self.rows = []
+        self.calls = []
+
+    async def run_query(self, query, params=None):
+        self.calls.append((query, params))
+        return list(self.rows)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(api, "run_query", fake.run_query)
+    return fake
+
+
+def test_paginate_keyset_seeks_past_the_cursor():
+    query, params = list_query("transactions", store_id=3, customer_id=None)
+    query, params = paginate(query, params, "transaction_id", limit=50, offset=0, after=1200)
+    assert query.endswith("AND store_id = %s AND transaction_id > %s ORDER BY transaction_id LIMIT %s")
+    assert params == [3, 1200, 50]
+
+
+def test_paginate_offset_mode():
+    query, params = paginate(*list_query("products"), "product_id", limit=10, offset=30, after=None)
+    assert query.endswith("ORDER BY product_id LIMIT %s OFFSET %s")
+    assert params == [10, 30]
+
+
+def test_full_page_returns_cursor_of_last_row(db):
+    db.rows = [{"product_id": 4}, {"product_id": 9}]
+    page = asyncio.run(api.paginated_query(*list_query("products"), "product_id", 2, 0, None))
+    assert page["count"] == 2
+    assert page["next_cursor"] == 9
+
+
+def test_short_page_ends_pagination(db):
+    db.rows = [{"product_id": 4}]
+    page = asyncio.run(api.paginated_query(*list_query("products"), "product_id", 2, 0, 3))
+    assert page["next_cursor"] is None
+    assert db.calls[0][1] == (3, 2)
+
+
+def test_parse_ids():
+    assert api.parse_ids("3,1,2") == [3, 1, 2]
+
+
+def test_parse_ids_rejects_too_many(monkeypatch):
+    monkeypatch.setattr(api, "BATCH_MAX_IDS", 3)
+    with pytest.raises(api.HTTPException) as error:
+        api.parse_ids("1,2,3,4")
+    assert error.value.status_code == 422
+
+
+def test_batch_lookup_reports_missing_ids_in_request_order(db):
+    db.rows = [{"product_id": 2}, {"product_id": 7}]
+    body = asyncio.run(api.batch_lookup("products", "product_id", [9, 2, 7, 2, 5]))
+    # Duplicates are queried and reported once
+    assert db.calls[0][1] == ([9, 2, 7, 5],)
+    assert body["missing"] == [9, 5]
+    assert body["count"] == 2
+    assert body["next_cursor"] is None